@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""
+Build Lock - Cross-process advisory locks for the icon generators
+
+The icon generators can be run concurrently against the same checkout (CI
+matrix jobs, or a developer running a script while another one is still
+busy). Without coordination, two processes write the same output file and
+both pay for the expensive conversion step.
+
+This module provides lock files with a single-flight rule:
+- One lock per target (e.g. a single .car file). The first process to take
+  it does the work; any other process waits for it to be released and then
+  reuses the freshly written output instead of rebuilding it.
+- One global lock guarding shared directory creation and cleanup.
+
+Ownership is an fcntl.flock() on the lock file, so the kernel releases it when
+the owning process dies, however it dies; there is no stale-lock breaking that
+could race with a live owner. An empty or leftover lock file whose flock is not
+held is simply taken over. The owner's PID and host are written into the file
+for diagnostics only (e.g. in LockTimeout messages).
+
+Directory Structure:
+- Locks: icons/.locks/<name>.lock
+
+Usage:
+    lock = BuildLock("car-my-icon", lock_dir)
+    before = target_signature(car_file)
+    with lock:
+        if lock.waited and target_signature(car_file) != before:
+            ...  # another process just built it, reuse the result
+"""
+
+import os
+import time
+import fcntl
+import socket
+from pathlib import Path
+
+DEFAULT_LOCK_DIR = Path("icons/.locks")
+GLOBAL_LOCK_NAME = "global"
+
+class LockTimeout(Exception):
+    """Raised when a lock could not be acquired within the given timeout."""
+
+def target_signature(path):
+    """
+    Return a cheap signature of a build target used to detect rewrites.
+
+    Args:
+        path (Path): Output file or directory
+
+    Returns:
+        tuple: (mtime_ns, size) of the target, or None if it does not exist
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class BuildLock:
+    """
+    Advisory lock file for a single build target (or the global lock).
+
+    Attributes:
+        path (Path): Location of the lock file
+        waited (bool): True if another process held the lock when we asked
+        wait_time (float): Seconds spent waiting for the lock
+    """
+
+    def __init__(self, name, lock_dir=DEFAULT_LOCK_DIR, timeout=None, poll_interval=0.1):
+        """
+        Args:
+            name (str): Lock name, usually derived from the target name
+            lock_dir (Path): Directory holding the lock files
+            timeout (float): Give up after this many seconds (None waits forever)
+            poll_interval (float): Delay between acquisition attempts
+        """
+        self.lock_dir = Path(lock_dir)
+        self.path = self.lock_dir / f"{name}.lock"
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.waited = False
+        self.wait_time = 0.0
+        self.held = False
+        self.fd = None
+
+    def owner(self):
+        """
+        Return the owner recorded in the lock file, for diagnostics.
+
+        Returns:
+            str: "pid N on HOST", or None if the file is missing or empty
+        """
+        try:
+            with open(self.path, "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        if len(lines) < 2:
+            return None
+        return f"pid {lines[0]} on {lines[1]}"
+
+    def _try_lock(self):
+        """
+        Try once to take the flock on the current lock file.
+
+        Returns:
+            int: Open descriptor holding the lock, or None if it is busy
+        """
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        # The previous owner may have unlinked the file between our open()
+        # and flock(); a lock on an unlinked inode protects nothing
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        st = os.fstat(fd)
+        if current is None or (current.st_dev, current.st_ino) != (st.st_dev, st.st_ino):
+            os.close(fd)
+            return None
+        return fd
+
+    def acquire(self):
+        """
+        Acquire the lock, waiting for other processes as needed.
+
+        Returns:
+            bool: True if we had to wait for another process
+
+        Raises:
+            LockTimeout: If the timeout expired before the lock was acquired
+        """
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        start = time.monotonic()
+        self.waited = False
+        while True:
+            fd = self._try_lock()
+            if fd is not None:
+                break
+            if not os.path.exists(self.path):
+                # Released and removed under us; retry right away
+                continue
+            self.waited = True
+            if self.timeout is not None and time.monotonic() - start >= self.timeout:
+                owner = self.owner()
+                raise LockTimeout(f"Timed out waiting for {self.path}" + (f" (held by {owner})" if owner else ""))
+            time.sleep(self.poll_interval)
+
+        try:
+            os.ftruncate(fd, 0)
+            os.write(fd, f"{os.getpid()}\n{socket.gethostname()}\n".encode())
+        except OSError:
+            # Do not leave a half-written lock file behind (e.g. on ENOSPC)
+            self._unlink()
+            os.close(fd)
+            raise
+        self.fd = fd
+        self.held = True
+        self.wait_time = time.monotonic() - start
+        return self.waited
+
+    def _unlink(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def release(self):
+        """Release the lock if it is held by this object."""
+        if not self.held:
+            return
+        self.held = False
+        # Unlink while still holding the flock; waiters that opened the old
+        # file notice the inode change and retry on a fresh one
+        self._unlink()
+        os.close(self.fd)
+        self.fd = None
+
+    def is_locked(self):
+        """
+        Check whether another process currently holds this lock.
+
+        Returns:
+            bool: True if some process holds the flock on the lock file
+        """
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def __enter__(self):
+        if not self.held:
+            self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+def global_lock(lock_dir=DEFAULT_LOCK_DIR, timeout=None):
+    """
+    Return the lock guarding shared directory creation and cleanup.
+
+    Args:
+        lock_dir (Path): Directory holding the lock files
+        timeout (float): Give up after this many seconds (None waits forever)
+
+    Returns:
+        BuildLock: Unacquired global lock
+    """
+    return BuildLock(GLOBAL_LOCK_NAME, lock_dir, timeout)
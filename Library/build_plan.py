@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+"""
+Build Plan - Machine-readable rebuild plans for the icon generators
+
+With --plan, a generator works out exactly which targets it would rebuild and
+why, then prints that as JSON on stdout instead of doing any work. It never
+runs external tools (actool, sips), takes locks or writes outputs, so it is
+cheap enough to run on a Linux CI runner before deciding whether the costly
+macOS job is needed at all.
+
+Exit codes in plan mode:
+    0: At least one target needs rebuilding
+    1: Error - missing directories or invalid arguments
+    3: Nothing to do - every target is up to date
+
+"Nothing to do" is only ever reported relative to a git baseline (--since).
+File timestamps are meaningless on a fresh checkout, so without a usable
+baseline (no --since, no build stamp, git failure) every target that looks up
+to date is listed with the reason "unknown (no baseline)" instead.
+
+JSON format:
+    {
+      "stage": "tahoe-assets",
+      "since": "<git revision or null>",
+      "requires_macos": true,
+      "targets": [
+        {"name": "...", "source": "...", "output": "...", "reason": "missing",
+         "input_bytes": 123456, "estimated_seconds": 2.6}
+      ],
+      "rebuild": 1,
+      "up_to_date": 70,
+      "skipped": 1,
+      "estimated_seconds": 2.6
+    }
+
+Cost estimates are rough per-stage figures (fixed overhead per target plus
+input size over throughput), meant for scheduling, not benchmarking.
+"""
+
+import os
+import json
+from pathlib import Path
+
+EXIT_NOTHING_TO_DO = 3
+NO_BASELINE_REASON = "unknown (no baseline)"
+
+# Rough cost model per stage: (seconds per target, input bytes per second)
+STAGE_COSTS = {
+    "icon-files": (0.05, 200 * 1024 * 1024),
+    "tahoe-assets": (2.5, 20 * 1024 * 1024),
+    "previews": (0.3, 50 * 1024 * 1024),
+}
+
+# Stages whose tools only exist on macOS
+MACOS_STAGES = {"tahoe-assets", "previews"}
+
+def input_bytes(path):
+    """
+    Return the size of a source file, or the total size of a source directory.
+
+    Args:
+        path (Path): Source file or directory (e.g. a .icon bundle)
+
+    Returns:
+        int: Size in bytes (0 if the source does not exist)
+    """
+    path = Path(path)
+    if path.is_dir():
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+def estimate_seconds(stage, size):
+    """
+    Estimate how long rebuilding one target of a stage takes.
+
+    Args:
+        stage (str): Pipeline stage name
+        size (int): Input size in bytes
+
+    Returns:
+        float: Estimated seconds
+    """
+    overhead, throughput = STAGE_COSTS.get(stage, (1.0, 10 * 1024 * 1024))
+    return round(overhead + size / throughput, 2)
+
+class BuildPlan:
+    """
+    Targets a stage would rebuild, with the reason and estimated cost of each.
+
+    Attributes:
+        stage (str): Pipeline stage name
+        since (str): Git revision used for change detection, or None if there
+            is no baseline and up-to-date checks cannot be trusted
+        targets (list): One dict per target to rebuild
+        up_to_date (int): Number of targets that need no work
+        skipped (int): Number of icons skipped by configuration
+    """
+
+    def __init__(self, stage, since=None):
+        self.stage = stage
+        self.since = since
+        self.targets = []
+        self.up_to_date = 0
+        self.skipped = 0
+
+    def add(self, name, source, output, reason):
+        """
+        Record a target; targets without a reason count as up to date.
+
+        Without a git baseline, targets without a reason are recorded with
+        NO_BASELINE_REASON rather than trusting file timestamps.
+
+        Args:
+            name (str): Icon name
+            source (Path): Input file or directory
+            output (Path): Output the stage would write
+            reason (str): Why it must be rebuilt, or None if up to date
+        """
+        if reason is None and self.since is None:
+            reason = NO_BASELINE_REASON
+        if reason is None:
+            self.up_to_date += 1
+            return
+        size = input_bytes(source)
+        self.targets.append({
+            "name": name,
+            "source": str(source),
+            "output": str(output),
+            "reason": reason,
+            "input_bytes": size,
+            "estimated_seconds": estimate_seconds(self.stage, size),
+        })
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-serializable plan
+        """
+        return {
+            "stage": self.stage,
+            "since": self.since,
+            "requires_macos": bool(self.targets) and self.stage in MACOS_STAGES,
+            "targets": self.targets,
+            "rebuild": len(self.targets),
+            "up_to_date": self.up_to_date,
+            "skipped": self.skipped,
+            "estimated_seconds": round(sum(t["estimated_seconds"] for t in self.targets), 2),
+        }
+
+    def emit(self, stream):
+        """
+        Write the plan as JSON and return the plan-mode exit code.
+
+        Args:
+            stream (file): Output stream (normally the real stdout)
+
+        Returns:
+            int: 0 if there is work to do, EXIT_NOTHING_TO_DO otherwise
+        """
+        json.dump(self.to_dict(), stream, indent=2)
+        stream.write("\n")
+        stream.flush()
+        return 0 if self.targets else EXIT_NOTHING_TO_DO
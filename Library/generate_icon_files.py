@@ -15,8 +15,11 @@ Features:
 - Smart timestamp-based up-to-date detection to avoid unnecessary regeneration
 - Configuration-based icon skipping via tahoe_config.json
 - Dry-run mode for previewing operations without making changes
+- Plan mode (--plan) emitting a JSON rebuild plan for CI without writing files
 - Force mode to regenerate all .icon files regardless of existing files
-- Progress tracking with step counters and status reporting
+- Progress tracking via typed events (human, tty, log or NDJSON output)
+- Cross-process locking so concurrent runs share work instead of regenerating
+- Git-aware change detection (--since) for fast CI runs on fresh checkouts
 - Comprehensive error handling and reporting
 
 Configuration:
@@ -28,17 +31,29 @@ Directory Structure:
 - Input:  icons/originals/     (source PNG files)
 - Output: icons/icon-files/   (.icon directory structures)
 - Config: Library/tahoe_config.json (optional skip configuration)
+- Locks:  icons/.locks/        (per-target and global lock files)
+- Stamp:  icons/.build-stamp.json (last successful build revision)
 
-Usage: python3 Library/generate_icon_files.py [--icons-dir DIR] [--dry-run] [--force]
+Usage: python3 Library/generate_icon_files.py [--icons-dir DIR] [--dry-run] [--force] [--since REV] [--plan]
+       [--progress MODE] [--events TARGET]
 """
 
 import os
 import sys
 import json
+import time
 import shutil
 import argparse
 from pathlib import Path
 
+from build_lock import BuildLock, DEFAULT_LOCK_DIR, LockTimeout, global_lock, target_signature
+from git_changes import DEFAULT_STAMP_FILE, changed_icon_names, resolve_since, select_sources, write_stamp
+from build_plan import BuildPlan
+from progress_events import ProgressBus, add_progress_arguments, open_progress
+
+ICON_FILES_DIR = Path("icons/icon-files")
+STAGE = "icon-files"
+
 def load_config():
     """
     Load configuration file for skipping icons.
@@ -93,14 +108,38 @@ def generate_icon_json(name):
         }
     }
 
-def create_icon_file(png_file, originals_dir, icon_files_dir, step, total, dry_run=False, force=False):
+def rebuild_reason(icon_file, force=False, changed=False):
+    """
+    Decide whether a .icon file has to be (re)generated.
+
+    Args:
+        icon_file (Path): Path to the .icon output
+        force (bool): If True, regenerate even if it exists
+        changed (bool): If True, git reported the source PNG as changed
+
+    Returns:
+        str: Reason for regenerating, or None if the file is up to date
+    """
+    if not icon_file.exists():
+        return "missing"
+    if changed:
+        return "changed in git"
+    if force:
+        return "forced"
+    return None
+
+def create_icon_file(png_file, originals_dir, icon_files_dir, step, total, dry_run=False, force=False, lock_dir=DEFAULT_LOCK_DIR, changed=False, events=None, lock_timeout=None):
     """
     Create a .icon file from a PNG source.
 
     Processes a single PNG file through the .icon creation pipeline:
-    1. Creates .icon directory structure
-    2. Copies PNG to Assets subfolder
-    3. Generates icon.json metadata file
+    1. Takes the per-target lock (waits if another process is creating it)
+    2. Creates .icon directory structure
+    3. Copies PNG to Assets subfolder
+    4. Generates icon.json metadata file
+
+    If another process created the same .icon while we were waiting for its
+    lock, the result is reused instead of being generated a second time.
 
     Args:
         png_file (Path): Path to source PNG file
@@ -110,49 +149,71 @@ def create_icon_file(png_file, originals_dir, icon_files_dir, step, total, dry_r
         total (int): Total number of files to process
         dry_run (bool): If True, only show what would be done
         force (bool): If True, recreate even if file exists
+        lock_dir (Path): Directory holding the build lock files
+        changed (bool): If True, git reported the source PNG as changed
+        events (ProgressBus): Progress event bus (None prints human-readable output)
+        lock_timeout (float): Seconds to wait for the target lock (None waits forever)
 
     Returns:
         bool: True if processing succeeded, False if failed
     """
     name = png_file.stem
     icon_file = icon_files_dir / f"{name}.icon"
+    events = events or ProgressBus(STAGE)
 
-    print(f"[{step:>{len(str(total))}}/{total}] Processing {name}")
+    events.start(name, step, total)
 
     # Dry run - just show what would happen
     if dry_run:
-        action = "Would recreate" if icon_file.exists() else "Would generate"
-        print(f"  -> {action}: {icon_file}")
-        print()
+        reason = rebuild_reason(icon_file, force, changed)
+        if reason is None:
+            events.skip(name, f"Up to date: {icon_file}", icon_file)
+        else:
+            action = "Would recreate" if icon_file.exists() else "Would generate"
+            events.finish(name, f"{action} ({reason}): {icon_file}", "would-generate", icon_file)
         return True
 
-    # Skip if up to date (unless forced)
-    if icon_file.exists() and not force:
-        print(f"  -> Up to date: {icon_file}")
-        print()
-        return True
+    lock = BuildLock(f"icon-{name}", lock_dir, lock_timeout)
+    before = target_signature(icon_file / "icon.json")
 
     try:
-        # Create .icon directory structure
-        assets_dir = icon_file / "Assets"
-        assets_dir.mkdir(parents=True, exist_ok=True)
+        lock.acquire()
+    except LockTimeout as e:
+        events.error(name, str(e))
+        return False
 
-        # Copy PNG to Assets folder
-        shutil.copy2(originals_dir / png_file.name, assets_dir / f"{name}.png")
+    with lock:
+        # Another process generated this target while we were waiting
+        if lock.waited and target_signature(icon_file / "icon.json") not in (None, before):
+            events.finish(name, f"Reused (generated by another process): {icon_file}", "reused", icon_file)
+            return True
 
-        # Generate icon.json configuration file
-        with open(icon_file / "icon.json", "w") as f:
-            json.dump(generate_icon_json(name), f, indent=2)
+        # Skip if up to date (unless forced)
+        if rebuild_reason(icon_file, force, changed) is None:
+            events.skip(name, f"Up to date: {icon_file}", icon_file)
+            return True
 
-        action = "Recreated" if force and icon_file.exists() else "Generated"
-        print(f"  -> {action}: {icon_file}")
-        print()
-        return True
+        existed = icon_file.exists()
 
-    except Exception as e:
-        print(f"  -> ERROR: {str(e)}")
-        print()
-        return False
+        try:
+            # Create .icon directory structure
+            assets_dir = icon_file / "Assets"
+            assets_dir.mkdir(parents=True, exist_ok=True)
+
+            # Copy PNG to Assets folder
+            shutil.copy2(originals_dir / png_file.name, assets_dir / f"{name}.png")
+
+            # Generate icon.json configuration file
+            with open(icon_file / "icon.json", "w") as f:
+                json.dump(generate_icon_json(name), f, indent=2)
+
+            action = "Recreated" if existed else "Generated"
+            events.finish(name, f"{action}: {icon_file}", action.lower(), icon_file)
+            return True
+
+        except Exception as e:
+            events.error(name, str(e))
+            return False
 
 def main():
     """
@@ -160,14 +221,18 @@ def main():
 
     Orchestrates the complete .icon file creation process:
     1. Validates command line arguments and shows help if requested
-    2. Sets up directory structure
-    3. Discovers PNG source files
-    4. Processes each PNG through the .icon creation pipeline
-    5. Reports final results
+    2. Asks git which icons changed when --since is given
+    3. Sets up directory structure
+    4. Discovers PNG source files
+    5. Processes each PNG through the .icon creation pipeline
+    6. Reports final results and records the build stamp
+
+    With --plan, steps 3-6 are replaced by printing a JSON rebuild plan.
 
     Exit codes:
-        0: Success - all icons processed
+        0: Success - all icons processed (or, with --plan, work to do)
         1: Error - missing directories, no source files, or processing failure
+        3: Nothing to do (--plan only)
     """
     parser = argparse.ArgumentParser(
         description="Generate .icon files from PNG sources for macOS icon compilation",
@@ -177,36 +242,81 @@ Examples:
   python3 Library/generate_icon_files.py --dry-run          # Preview what would be done
   python3 Library/generate_icon_files.py --force            # Force regenerate all files
   python3 Library/generate_icon_files.py --icons-dir custom # Use custom directory
+  python3 Library/generate_icon_files.py --since origin/master # Only icons changed since a revision
+  python3 Library/generate_icon_files.py --since auto       # Only icons changed since the last build
+  python3 Library/generate_icon_files.py --plan --since auto # JSON plan, exit 3 if nothing to do
 
 Notes:
   - Processes PNG files from originals directory
   - Outputs to icons/icon-files/ as .icon directories
   - Use with generate_tahoe_assets_car.py for complete pipeline
+  - Concurrent runs wait for each other per icon and reuse finished results
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument("--dry-run", action="store_true", help="Show what would be processed without generating files")
     parser.add_argument("--force", action="store_true", help="Force regeneration of all .icon files, even if up to date")
     parser.add_argument("--icons-dir", default="icons/originals", help="Directory containing source .png files (default: icons/originals)")
+    parser.add_argument("--lock-dir", default=str(DEFAULT_LOCK_DIR), help=f"Directory for cross-process lock files (default: {DEFAULT_LOCK_DIR})")
+    parser.add_argument("--lock-timeout", type=float, metavar="SECONDS", help="Give up on an icon if its lock is held longer than this by another process (default: wait forever)")
+    parser.add_argument("--since", metavar="REV", help="Only regenerate icons whose inputs changed since git revision REV ('auto' uses the last successful build revision)")
+    parser.add_argument("--stamp-file", default=str(DEFAULT_STAMP_FILE), help=f"File recording the last successful build revision (default: {DEFAULT_STAMP_FILE})")
+    parser.add_argument("--plan", action="store_true", help="Print a JSON plan of what would be generated and why, without writing files (exit 3 if nothing to do)")
+    add_progress_arguments(parser)
     args = parser.parse_args()
 
+    # In plan mode stdout carries only the JSON plan; everything else goes to stderr.
+    # Planning never writes outputs, just like a dry run.
+    plan_out = sys.stdout
+    if args.plan:
+        sys.stdout = sys.stderr
+        args.dry_run = True
+
     print("==> Icon Files Generator for Emacs Icons")
-    if args.dry_run:
+    if args.plan:
+        print("    [PLAN MODE]")
+    elif args.dry_run:
         print("    [DRY RUN MODE]")
     if args.force:
         print("    [FORCE MODE]")
     print()
 
+    # Per-icon progress is reported as events (human-readable output by default)
+    events = open_progress(STAGE, args.progress, args.events)
+
     # Check icons directory exists
     icons_dir = Path(args.icons_dir)
     if not icons_dir.exists():
         print(f"ERROR: {args.icons_dir}/ directory not found")
         sys.exit(1)
 
+    # Ask git which icons changed (None means check every icon)
+    stamp_file = Path(args.stamp_file)
+    lock_dir = Path(args.lock_dir)
+    changed = None
+    if args.since and args.force:
+        print(f"Ignoring --since {args.since}: --force rebuilds every icon")
+        print()
+    elif args.since:
+        changed = changed_icon_names(args.since, STAGE, icons_dir, ICON_FILES_DIR, ("originals", "config"), stamp_file)
+        if changed is not None and not changed:
+            print(f"No relevant changes since {args.since}, nothing to do")
+            if args.plan:
+                sys.exit(BuildPlan(STAGE, resolve_since(args.since, STAGE, stamp_file)).emit(plan_out))
+            if not args.dry_run:
+                write_stamp(STAGE, stamp_file, lock_dir, args.lock_timeout)
+            return
+        print()
+
     # Create icon-files directory
-    icon_files_dir = Path("icons/icon-files")
+    icon_files_dir = ICON_FILES_DIR
     if not args.dry_run:
-        icon_files_dir.mkdir(exist_ok=True)
+        try:
+            with global_lock(lock_dir, args.lock_timeout):
+                icon_files_dir.mkdir(exist_ok=True)
+        except LockTimeout as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
 
     # Load configuration for skipped icons
     skip_icons = load_config()
@@ -214,9 +324,13 @@ Notes:
         print(f"Skipping icons from config: {', '.join(sorted(skip_icons))}")
         print()
 
-    # Find all .png files to process
-    png_files = list(icons_dir.glob("*.png"))
-    if not png_files:
+    # Find all .png files to process (only the changed ones with --since)
+    scan_started = time.monotonic()
+    if changed is not None:
+        png_files = select_sources(changed, icons_dir, ".png")
+    else:
+        png_files = list(icons_dir.glob("*.png"))
+    if not png_files and changed is None:
         print(f"No .png files found in {args.icons_dir}/ directory")
         sys.exit(1)
 
@@ -232,27 +346,43 @@ Notes:
     
     png_files = filtered_png_files
 
+    # Icons reported by git are regenerated even if they exist
+    in_git_changes = changed is not None
+
     # Show what will be processed
     total_found = len(png_files) + skipped_count
-    print(f"Found {total_found} .png files ({len(png_files)} to process, {skipped_count} skipped):")
+    items = []
     for png_file in sorted(png_files):
         output_path = icon_files_dir / f"{png_file.stem}.icon"
         status = "missing"
         if output_path.exists():
-            status = "will update" if args.force else "up to date"
-        print(f"  - {png_file.stem} ({status})")
-    print()
+            status = "will update" if rebuild_reason(output_path, args.force, in_git_changes) else "up to date"
+        items.append({"name": png_file.stem, "status": status})
+    events.scan(f"Found {total_found} .png files ({len(png_files)} to process, {skipped_count} skipped):", items,
+                found=total_found, to_process=len(png_files), skipped=skipped_count,
+                duration=round(time.monotonic() - scan_started, 3))
+
+    # Plan mode - report what would be generated and stop
+    if args.plan:
+        plan = BuildPlan(STAGE, resolve_since(args.since, STAGE, stamp_file) if in_git_changes else None)
+        plan.skipped = skipped_count
+        for png_file in sorted(png_files):
+            icon_file = icon_files_dir / f"{png_file.stem}.icon"
+            plan.add(png_file.stem, png_file, icon_file, rebuild_reason(icon_file, args.force, in_git_changes))
+        events.close()
+        sys.exit(plan.emit(plan_out))
 
     # Process each .png file
     processed = skipped = 0
     failed = []
 
     for i, png_file in enumerate(sorted(png_files), 1):
-        result = create_icon_file(png_file, icons_dir, icon_files_dir, i, len(png_files), args.dry_run, args.force)
+        result = create_icon_file(png_file, icons_dir, icon_files_dir, i, len(png_files), args.dry_run, args.force, lock_dir, in_git_changes, events, args.lock_timeout)
         if result:
             processed += 1
         else:
             failed.append(png_file.stem)
+    events.close()
 
     # Show results summary
     print("==> Summary")
@@ -267,5 +397,9 @@ Notes:
     if failed:
         sys.exit(1)
 
+    # Record this revision for --since auto
+    if not args.dry_run:
+        write_stamp(STAGE, stamp_file, lock_dir, args.lock_timeout)
+
 if __name__ == "__main__":
     main()
@@ -15,23 +15,38 @@ Features:
 - Batch processing of all PNG files in the source directory
 - Smart timestamp-based up-to-date detection to avoid unnecessary regeneration
 - Dry-run mode for previewing operations without making changes
+- Plan mode (--plan) emitting a JSON rebuild plan for CI without running sips
 - Force mode to regenerate all previews regardless of timestamps
-- Progress tracking with step counters and status reporting
+- Progress tracking via typed events (human, tty, log or NDJSON output)
+- Cross-process locking so concurrent runs share work instead of regenerating
+- Git-aware change detection (--since) for fast CI runs on fresh checkouts
 - Comprehensive error handling and reporting
 
 Directory Structure:
 - Input:  icons/originals/    (source PNG files from .icns conversion)
 - Output: icons/previews/     (128x128@72dpi standardized previews)
+- Locks:  icons/.locks/       (per-target and global lock files)
+- Stamp:  icons/.build-stamp.json (last successful build revision)
 
-Usage: python3 Library/generate_preview_files.py [--icons-dir DIR] [--dry-run] [--force]
+Usage: python3 Library/generate_preview_files.py [--icons-dir DIR] [--dry-run] [--force] [--since REV] [--plan]
+       [--progress MODE] [--events TARGET]
 """
 
 import os
 import sys
+import time
 import subprocess
 import argparse
 from pathlib import Path
 
+from build_lock import BuildLock, DEFAULT_LOCK_DIR, LockTimeout, global_lock, target_signature
+from git_changes import DEFAULT_STAMP_FILE, changed_icon_names, resolve_since, select_sources, write_stamp
+from build_plan import BuildPlan
+from progress_events import ProgressBus, add_progress_arguments, open_progress
+
+ICON_FILES_DIR = Path("icons/icon-files")
+STAGE = "previews"
+
 def check_dependencies():
     """
     Check if sips command is available on the system.
@@ -53,7 +68,30 @@ def check_dependencies():
         print("ERROR: sips not found. This script requires macOS.")
         sys.exit(1)
 
-def process_icon(png_file, preview_dir, step, total, dry_run=False, force=False):
+def rebuild_reason(png_file, preview_file, force=False, changed=False):
+    """
+    Decide whether a preview image has to be (re)generated.
+
+    Args:
+        png_file (Path): Path to the source PNG file
+        preview_file (Path): Path to the preview output
+        force (bool): If True, regenerate even if up to date
+        changed (bool): If True, git reported the source PNG as changed
+
+    Returns:
+        str: Reason for regenerating, or None if the preview is up to date
+    """
+    if not preview_file.exists():
+        return "missing"
+    if changed:
+        return "changed in git"
+    if force:
+        return "forced"
+    if png_file.stat().st_mtime > preview_file.stat().st_mtime:
+        return "source newer"
+    return None
+
+def process_icon(png_file, preview_dir, step, total, dry_run=False, force=False, lock_dir=DEFAULT_LOCK_DIR, changed=False, events=None, lock_timeout=None):
     """
     Process a single PNG file into a standardized 128x128@72dpi preview image.
 
@@ -68,65 +106,82 @@ def process_icon(png_file, preview_dir, step, total, dry_run=False, force=False)
         total (int): Total number of files to process
         dry_run (bool): If True, only show what would be done without processing
         force (bool): If True, regenerate even if preview is up to date
+        lock_dir (Path): Directory holding the build lock files
+        changed (bool): If True, git reported the source PNG as changed
+        events (ProgressBus): Progress event bus (None prints human-readable output)
+        lock_timeout (float): Seconds to wait for the target lock (None waits forever)
 
     Returns:
         bool: True if processing succeeded, False if it failed
 
     Processing Steps:
-        1. Check if preview file exists and is up to date (unless force=True)
-        2. Use sips to resize image to 128x128 pixels
-        3. Set DPI to 72 for consistent display across platforms
-        4. Verify the output file was created successfully
+        1. Take the per-target lock, reusing the result if another process
+           generated this preview while we were waiting
+        2. Check if preview file exists and is up to date (unless force=True)
+        3. Use sips to resize image to 128x128 pixels
+        4. Set DPI to 72 for consistent display across platforms
+        5. Verify the output file was created successfully
     """
     name = png_file.stem
     preview_file = preview_dir / f"{name}.png"
+    events = events or ProgressBus(STAGE)
 
-    print(f"[{step:>{len(str(total))}}/{total}] Processing {name}")
+    events.start(name, step, total)
 
     # Dry run - just show what would happen
     if dry_run:
-        print(f"  -> Would generate: {preview_file}")
-        print()
+        reason = rebuild_reason(png_file, preview_file, force, changed)
+        if reason is None:
+            events.skip(name, f"Up to date: {preview_file}", preview_file)
+        else:
+            events.finish(name, f"Would generate ({reason}): {preview_file}", "would-generate", preview_file)
         return True
 
-    # Skip if up to date (unless forced)
-    if preview_file.exists() and not force:
-        if png_file.stat().st_mtime <= preview_file.stat().st_mtime:
-            print(f"  -> Up to date: {preview_file}")
-            print()
-            return True
+    lock = BuildLock(f"preview-{name}", lock_dir, lock_timeout)
+    before = target_signature(preview_file)
 
     try:
-        # Generate 128x128@72dpi preview using sips
-        print("  -> Generating preview...")
-        subprocess.run([
-            "sips",
-            "-z", "128", "128",  # Resize to 128x128
-            "-s", "dpiHeight", "72",  # Set DPI to 72
-            "-s", "dpiWidth", "72",
-            str(png_file),
-            "--out", str(preview_file)
-        ], capture_output=True, check=True, text=True)
-
-        if preview_file.exists():
-            print(f"  -> Created {preview_file}")
-            print()
+        lock.acquire()
+    except LockTimeout as e:
+        events.error(name, str(e))
+        return False
+
+    with lock:
+        # Another process generated this target while we were waiting
+        if lock.waited and target_signature(preview_file) not in (None, before):
+            events.finish(name, f"Reused (generated by another process): {preview_file}", "reused", preview_file)
             return True
-        else:
-            print(f"  -> ERROR: Failed to generate preview")
-            print()
-            return False
 
-    except subprocess.CalledProcessError as e:
-        print(f"  -> ERROR: Processing failed")
-        if e.stderr:
-            print(f"     {e.stderr.strip()}")
-        print()
-        return False
-    except Exception as e:
-        print(f"  -> ERROR: {e}")
-        print()
-        return False
+        # Skip if up to date (unless forced)
+        if rebuild_reason(png_file, preview_file, force, changed) is None:
+            events.skip(name, f"Up to date: {preview_file}", preview_file)
+            return True
+
+        try:
+            # Generate 128x128@72dpi preview using sips
+            events.info(name, "Generating preview...")
+            subprocess.run([
+                "sips",
+                "-z", "128", "128",  # Resize to 128x128
+                "-s", "dpiHeight", "72",  # Set DPI to 72
+                "-s", "dpiWidth", "72",
+                str(png_file),
+                "--out", str(preview_file)
+            ], capture_output=True, check=True, text=True)
+
+            if preview_file.exists():
+                events.finish(name, f"Created {preview_file}", "created", preview_file)
+                return True
+            else:
+                events.error(name, "Failed to generate preview")
+                return False
+
+        except subprocess.CalledProcessError as e:
+            events.error(name, "Processing failed", e.stderr.strip() if e.stderr else None)
+            return False
+        except Exception as e:
+            events.error(name, str(e))
+            return False
 
 def main():
     """
@@ -135,19 +190,25 @@ def main():
     This function orchestrates the entire preview generation process:
     1. Parses command line arguments for configuration options
     2. Validates that source and destination directories exist
-    3. Discovers all PNG files in the source directory
-    4. Checks dependencies (sips command availability)
-    5. Processes each PNG file to create standardized previews
-    6. Provides comprehensive progress reporting and error handling
+    3. Asks git which icons changed when --since is given
+    4. Discovers all PNG files in the source directory
+    5. Checks dependencies (sips command availability)
+    6. Processes each PNG file to create standardized previews
+    7. Provides comprehensive progress reporting and error handling
 
     Command Line Arguments:
         --dry-run: Preview operations without making changes
         --force: Regenerate all previews regardless of timestamps
         --icons-dir: Specify custom source directory (default: icons/originals)
+        --since: Only process icons changed since a git revision ('auto' for last build)
+        --plan: Print a JSON rebuild plan instead of processing anything
+        --progress: Progress display (human, tty, log or quiet)
+        --events: Also write NDJSON progress events to a file or fd:N
 
     Exit Codes:
-        0: Success - all files processed without errors
+        0: Success - all files processed without errors (or, with --plan, work to do)
         1: Error - missing dependencies, directories, or processing failures
+        3: Nothing to do (--plan only)
     """
     parser = argparse.ArgumentParser(
         description="Generate 128x128@72dpi preview images for icon documentation",
@@ -157,66 +218,131 @@ Examples:
   python3 Library/generate_preview_files.py --dry-run          # Preview what would be done
   python3 Library/generate_preview_files.py --force            # Force regenerate all files
   python3 Library/generate_preview_files.py --icons-dir custom # Use custom directory
+  python3 Library/generate_preview_files.py --since origin/master # Only icons changed since a revision
+  python3 Library/generate_preview_files.py --since auto       # Only icons changed since the last build
+  python3 Library/generate_preview_files.py --plan --since auto # JSON plan, exit 3 if nothing to do
 
 Notes:
   - Requires macOS (uses sips command)
   - Processes PNG files from originals directory
   - Outputs to icons/previews/ at 128x128@72dpi
+  - Concurrent runs wait for each other per icon and reuse finished results
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument("--dry-run", action="store_true", help="Show what would be processed without generating files")
     parser.add_argument("--force", action="store_true", help="Force regeneration of all preview files, even if up to date")
     parser.add_argument("--icons-dir", default="icons/originals", help="Directory containing source .png files (default: icons/originals)")
+    parser.add_argument("--lock-dir", default=str(DEFAULT_LOCK_DIR), help=f"Directory for cross-process lock files (default: {DEFAULT_LOCK_DIR})")
+    parser.add_argument("--lock-timeout", type=float, metavar="SECONDS", help="Give up on an icon if its lock is held longer than this by another process (default: wait forever)")
+    parser.add_argument("--since", metavar="REV", help="Only regenerate icons whose inputs changed since git revision REV ('auto' uses the last successful build revision)")
+    parser.add_argument("--stamp-file", default=str(DEFAULT_STAMP_FILE), help=f"File recording the last successful build revision (default: {DEFAULT_STAMP_FILE})")
+    parser.add_argument("--plan", action="store_true", help="Print a JSON plan of what would be generated and why, without running sips (exit 3 if nothing to do)")
+    add_progress_arguments(parser)
     args = parser.parse_args()
 
+    # In plan mode stdout carries only the JSON plan; everything else goes to stderr.
+    # Planning never touches tools or writes outputs, just like a dry run.
+    plan_out = sys.stdout
+    if args.plan:
+        sys.stdout = sys.stderr
+        args.dry_run = True
+
     print("==> Preview Generator for Emacs Icons")
-    if args.dry_run:
+    if args.plan:
+        print("    [PLAN MODE]")
+    elif args.dry_run:
         print("    [DRY RUN MODE]")
     print()
 
+    # Per-icon progress is reported as events (human-readable output by default)
+    events = open_progress(STAGE, args.progress, args.events)
+
     # Check icons directory exists
     icons_dir = Path(args.icons_dir)
     if not icons_dir.exists():
         print(f"ERROR: {args.icons_dir}/ directory not found")
         sys.exit(1)
 
+    # Ask git which icons changed (None means check every icon)
+    stamp_file = Path(args.stamp_file)
+    lock_dir = Path(args.lock_dir)
+    changed = None
+    if args.since and args.force:
+        print(f"Ignoring --since {args.since}: --force rebuilds every icon")
+        print()
+    elif args.since:
+        changed = changed_icon_names(args.since, STAGE, icons_dir, ICON_FILES_DIR, ("originals",), stamp_file)
+        if changed is not None and not changed:
+            print(f"No relevant changes since {args.since}, nothing to do")
+            if args.plan:
+                sys.exit(BuildPlan(STAGE, resolve_since(args.since, STAGE, stamp_file)).emit(plan_out))
+            if not args.dry_run:
+                write_stamp(STAGE, stamp_file, lock_dir, args.lock_timeout)
+            return
+        print()
+
     # Create preview directory
     preview_dir = Path("icons/previews")
-    preview_dir.mkdir(exist_ok=True)
+    if not args.plan:
+        try:
+            with global_lock(lock_dir, args.lock_timeout):
+                preview_dir.mkdir(exist_ok=True)
+        except LockTimeout as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
 
     # Check dependencies (skip in dry-run to avoid unnecessary checks)
     if not args.dry_run:
         check_dependencies()
 
-    # Find all .png files to process
-    png_files = list(icons_dir.glob("*.png"))
-    if not png_files:
+    # Find all .png files to process (only the changed ones with --since)
+    scan_started = time.monotonic()
+    if changed is not None:
+        png_files = select_sources(changed, icons_dir, ".png")
+    else:
+        png_files = list(icons_dir.glob("*.png"))
+    if not png_files and changed is None:
         print(f"No .png files found in {args.icons_dir}/ directory")
         sys.exit(1)
 
+    # Icons reported by git are regenerated regardless of timestamps
+    in_git_changes = changed is not None
+
     # Show what will be processed
-    print(f"Found {len(png_files)} .png files:")
+    items = []
     for png_file in sorted(png_files):
         output_path = preview_dir / f"{png_file.stem}.png"
         status = "missing"
         if output_path.exists():
-            status = "will update" if args.force or output_path.stat().st_mtime <= png_file.stat().st_mtime else "up to date"
-        print(f"  - {png_file.stem} ({status})")
-    print()
+            status = "will update" if rebuild_reason(png_file, output_path, args.force, in_git_changes) else "up to date"
+        items.append({"name": png_file.stem, "status": status})
+    events.scan(f"Found {len(png_files)} .png files:", items,
+                found=len(png_files), to_process=len(png_files), skipped=0,
+                duration=round(time.monotonic() - scan_started, 3))
+
+    # Plan mode - report what would be generated and stop
+    if args.plan:
+        plan = BuildPlan(STAGE, resolve_since(args.since, STAGE, stamp_file) if in_git_changes else None)
+        for png_file in sorted(png_files):
+            preview_file = preview_dir / f"{png_file.stem}.png"
+            plan.add(png_file.stem, png_file, preview_file, rebuild_reason(png_file, preview_file, args.force, in_git_changes))
+        events.close()
+        sys.exit(plan.emit(plan_out))
 
     # Process each .png file
     processed = skipped = 0
     failed = []
 
     for i, png_file in enumerate(sorted(png_files), 1):
-        result = process_icon(png_file, preview_dir, i, len(png_files), args.dry_run, args.force)
+        result = process_icon(png_file, preview_dir, i, len(png_files), args.dry_run, args.force, lock_dir, in_git_changes, events, args.lock_timeout)
         if result == "skipped":
             skipped += 1
         elif result:
             processed += 1
         else:
             failed.append(png_file.stem)
+    events.close()
 
     # Show results summary
     print("==> Summary")
@@ -227,5 +353,9 @@ Notes:
         if failed:
             print(f"Failed icons: {', '.join(failed)}")
 
+    # Record this revision for --since auto
+    if not args.dry_run and not failed:
+        write_stamp(STAGE, stamp_file, lock_dir, args.lock_timeout)
+
 if __name__ == "__main__":
     main()
@@ -15,57 +15,305 @@ Features:
 - Smart timestamp-based up-to-date detection to avoid unnecessary recompilation
 - Configuration-based icon skipping via tahoe_config.json
 - Dry-run mode for previewing operations without making changes
+- Plan mode (--plan) emitting a JSON rebuild plan for CI without running actool
+- Output profiles (--profile) trading backwards compatibility against .car size,
+  recorded per Assets.car so switching profiles recompiles the affected files
+- Per-icon size budget report (--size-report) flagging oversized Assets.car files
 - Force mode to recompile all Assets.car files regardless of existing files
-- Progress tracking with step counters and status reporting
+- Progress tracking via typed events (human, tty, log or NDJSON output)
+- Cross-process locking so concurrent runs share work instead of recompiling
+- Git-aware change detection (--since) for fast CI runs on fresh checkouts
+- Bounded-memory capture of actool output, with a per-icon log on failure
 - Comprehensive error handling and reporting
 
 Configuration:
 - Config file: Library/tahoe_config.json
 - Skip icons by adding them to the "skip_icons" array
 - Example: {"skip_icons": ["liquid-glass", "other-icon"]}
+- Select the default output profile with "car_profile", add or override
+  profiles in "car_profiles" and set size limits in "size_budget"
 
 Directory Structure:
 - Input:  icons/icon-files/  (.icon directory structures)
-- Output: icons/macos-26+/   (Assets.car compiled files)
+- Output: icons/macos-26+/   (Assets.car compiled files, plus .<name>.profile.json
+          recording the output profile each one was compiled with, and
+          .profile.json recording the profile of the last complete run)
 - Config: Library/tahoe_config.json (optional skip configuration)
-
-Usage: python3 Library/generate_tahoe_assets_car.py [--icons-dir DIR] [--dry-run] [--force]
+- Locks:  icons/.locks/        (per-target and global lock files)
+- Stamp:  icons/.build-stamp.json (last successful build revision)
+- Logs:   icons/macos-26+/<name>.log (tail of actool output on failure;
+          with --verbose always, plus <name>.log.1.gz for older output)
+
+Usage: python3 Library/generate_tahoe_assets_car.py [--icons-dir DIR] [--dry-run] [--force] [--actool PATH] [--since REV] [--plan]
+       [--profile NAME] [--size-report [FILE]] [--enforce-budget]
+       [--progress MODE] [--events TARGET] [--verbose] [--log-tail KB]
 """
 
 import os
 import sys
 import json
+import time
 import shutil
 import subprocess
 import argparse
 from pathlib import Path
 
-def load_config():
+from build_lock import BuildLock, DEFAULT_LOCK_DIR, LockTimeout, global_lock, target_signature
+from git_changes import DEFAULT_STAMP_FILE, changed_icon_names, resolve_since, select_sources, write_stamp
+from build_plan import BuildPlan
+from size_report import build_size_report, load_budget, print_size_report, write_size_report_json
+from progress_events import ProgressBus, add_progress_arguments, open_progress
+from tool_output import DEFAULT_TAIL_BYTES, ToolError, run_captured
+
+ACTOOL = "/Applications/Xcode.app/Contents/Developer/usr/bin/actool"
+ORIGINALS_DIR = Path("icons/originals")
+MACOS26_DIR = Path("icons/macos-26+")
+RUN_PROFILE_RECORD = ".profile.json"
+STAGE = "tahoe-assets"
+
+# actool output profiles, trading backwards compatibility against .car size:
+# - minimum_deployment_target: oldest macOS the renditions are generated for
+# - fallback_generation: let actool generate icon stack fallback renditions
+# - keep_icns: keep the backwards-compatible .icns actool may produce
+# - extra_args: additional actool arguments
+CAR_PROFILES = {
+    "default": {
+        "minimum_deployment_target": "11.0",
+        "fallback_generation": False,
+        "keep_icns": False,
+        "extra_args": [],
+    },
+    "compact": {
+        "minimum_deployment_target": "26.0",
+        "fallback_generation": False,
+        "keep_icns": False,
+        "extra_args": [],
+    },
+    "compatible": {
+        "minimum_deployment_target": "11.0",
+        "fallback_generation": True,
+        "keep_icns": True,
+        "extra_args": [],
+    },
+}
+
+def read_config():
     """
-    Load configuration file for skipping icons.
-    
+    Read the pipeline configuration file.
+
     Returns:
-        set: Set of icon names to skip
+        dict: Parsed configuration (empty if missing or invalid)
     """
     config_file = Path(__file__).parent / "tahoe_config.json"
     if config_file.exists():
         try:
             with open(config_file, 'r') as f:
                 config = json.load(f)
-                return set(config.get('skip_icons', []))
-        except (json.JSONDecodeError, KeyError):
-            print(f"WARNING: Invalid config file {config_file}, ignoring")
-    return set()
+                if isinstance(config, dict):
+                    return config
+        except json.JSONDecodeError:
+            pass
+        print(f"WARNING: Invalid config file {config_file}, ignoring")
+    return {}
+
+def load_config():
+    """
+    Load configuration file for skipping icons.
+    
+    Returns:
+        set: Set of icon names to skip
+    """
+    return set(read_config().get('skip_icons', []))
+
+def load_profile(name=None, config=None):
+    """
+    Resolve an actool output profile.
+
+    Profiles from the "car_profiles" config section override or extend the
+    built-in CAR_PROFILES; unspecified keys fall back to the default profile.
+
+    Args:
+        name (str): Profile name (None uses "car_profile" from config, then "default")
+        config (dict): Parsed configuration (read from disk if None)
+
+    Returns:
+        tuple: (profile name, profile dict), or (name, None) if it is unknown
+    """
+    config = read_config() if config is None else config
+    name = name or config.get("car_profile", "default")
+    profiles = {key: dict(value) for key, value in CAR_PROFILES.items()}
+    for key, value in config.get("car_profiles", {}).items():
+        profiles.setdefault(key, {}).update(value)
+    if name not in profiles:
+        return name, None
+    profile = dict(CAR_PROFILES["default"])
+    profile.update(profiles[name])
+    return name, profile
+
+def actool_args(actool, icon_file, output_dir, name, profile=None):
+    """
+    Build the actool command line for a profile.
+
+    Args:
+        actool (str): Path to actool executable
+        icon_file (Path): Path to .icon file
+        output_dir (Path): Temporary output directory
+        name (str): Icon name (used as app icon name)
+        profile (dict): Output profile (None uses the default profile)
+
+    Returns:
+        list: Command line arguments
+    """
+    profile = profile or CAR_PROFILES["default"]
+    fallback = "enabled" if profile["fallback_generation"] else "disabled"
+    return [
+        actool, str(icon_file),
+        "--compile", str(output_dir),
+        "--platform", "macosx",
+        "--minimum-deployment-target", str(profile["minimum_deployment_target"]),
+        "--app-icon", name,
+        "--output-partial-info-plist", str(output_dir / "partial-info.plist"),
+        f"--enable-icon-stack-fallback-generation={fallback}",
+        *profile.get("extra_args", []),
+    ]
+
+def source_png(icon_file):
+    """
+    Return the source PNG of a .icon file (the one compiled by actool).
+
+    Args:
+        icon_file (Path): Path to .icon file
+
+    Returns:
+        Path: PNG inside the .icon Assets folder, or the original PNG
+    """
+    name = icon_file.stem.replace('.icon', '')
+    png_file = icon_file / "Assets" / f"{name}.png"
+    return png_file if png_file.exists() else ORIGINALS_DIR / f"{name}.png"
 
-def compile_icon_to_car(icon_file, icon_files_dir, macos26_dir, actool, step, total, dry_run=False, force=False):
+def profile_record(car_file):
+    """
+    Return the file recording which output profile an Assets.car was compiled with.
+
+    Args:
+        car_file (Path): Path to the Assets.car output
+
+    Returns:
+        Path: Hidden JSON file next to the Assets.car
+    """
+    return car_file.with_name(f".{car_file.stem}.profile.json")
+
+def read_profile(record):
+    """
+    Read a recorded output profile.
+
+    Outputs without a record predate profile tracking and were compiled with
+    the default profile.
+
+    Args:
+        record (Path): Profile record file
+
+    Returns:
+        dict: Recorded profile (None if the record is unreadable)
+    """
+    try:
+        with open(record, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return CAR_PROFILES["default"]
+    except json.JSONDecodeError:
+        return None
+
+def write_profile(record, profile=None):
+    """
+    Atomically record an output profile.
+
+    Args:
+        record (Path): Profile record file
+        profile (dict): Output profile (None means the default profile)
+    """
+    tmp_record = record.with_name(f"{record.name}.tmp")
+    with open(tmp_record, "w") as f:
+        json.dump(profile or CAR_PROFILES["default"], f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_record, record)
+
+def profile_reason(car_file, profile=None):
+    """
+    Check whether an Assets.car was compiled with a different output profile.
+
+    Args:
+        car_file (Path): Path to the Assets.car output
+        profile (dict): Requested output profile (None means the default profile)
+
+    Returns:
+        str: "profile changed", or None if the recorded profile matches
+    """
+    built = read_profile(profile_record(car_file))
+    return None if built == (profile or CAR_PROFILES["default"]) else "profile changed"
+
+def profile_changed_icons(icons_dir, macos26_dir, profile=None):
+    """
+    Return the icons whose Assets.car was compiled with a different output profile.
+
+    Every complete run records its profile in RUN_PROFILE_RECORD, at which
+    point all Assets.car files match it. If the requested profile matches
+    that record, a single file read answers the question; only otherwise are
+    the per-icon records checked.
+
+    Args:
+        icons_dir (Path): Directory containing .icon files
+        macos26_dir (Path): Output directory for Assets.car files
+        profile (dict): Requested output profile (None means the default profile)
+
+    Returns:
+        set: Names of icons compiled with a different profile
+    """
+    if read_profile(macos26_dir / RUN_PROFILE_RECORD) == (profile or CAR_PROFILES["default"]):
+        return set()
+    names = {icon_file.stem.replace('.icon', '') for icon_file in icons_dir.glob("*.icon")}
+    return {name for name in names if profile_reason(macos26_dir / f"{name}.car", profile)}
+
+def rebuild_reason(icon_file, car_file, force=False, changed=False, profile=None):
+    """
+    Decide whether an Assets.car file has to be (re)compiled.
+
+    Args:
+        icon_file (Path): Path to .icon file
+        car_file (Path): Path to the Assets.car output
+        force (bool): If True, recompile even if up to date
+        changed (bool): If True, git reported the icon's inputs as changed
+        profile (dict): Requested output profile (None means the default profile)
+
+    Returns:
+        str: Reason for recompiling, or None if the file is up to date
+    """
+    if not car_file.exists():
+        return "missing"
+    if profile_reason(car_file, profile):
+        return "profile changed"
+    if changed:
+        return "changed in git"
+    if force:
+        return "forced"
+    if icon_file.stat().st_mtime > car_file.stat().st_mtime:
+        return "source newer"
+    return None
+
+def compile_icon_to_car(icon_file, icon_files_dir, macos26_dir, actool, step, total, dry_run=False, force=False, lock_dir=DEFAULT_LOCK_DIR, changed=False, profile=None, events=None, verbose=False, log_tail=DEFAULT_TAIL_BYTES, lock_timeout=None):
     """
     Compile a .icon file to Assets.car using actool.
 
     Processes a single .icon file through the Assets.car compilation pipeline:
-    1. Creates temporary output directory
-    2. Uses Apple's actool to compile .icon to Assets.car
-    3. Moves compiled Assets.car to final location
-    4. Cleans up temporary files
+    1. Takes the per-target lock (waits if another process is compiling it)
+    2. Creates temporary output directory
+    3. Uses Apple's actool to compile .icon to Assets.car with the output profile,
+       streaming its output through a bounded buffer (last bytes logged on failure)
+    4. Moves compiled Assets.car (and .icns if the profile keeps it) to final location
+    5. Cleans up temporary files
+
+    If another process compiled the same Assets.car while we were waiting for
+    its lock, the result is reused instead of being compiled a second time.
 
     Args:
         icon_file (Path): Path to .icon file
@@ -76,75 +324,153 @@ def compile_icon_to_car(icon_file, icon_files_dir, macos26_dir, actool, step, to
         total (int): Total number of files to process
         dry_run (bool): If True, only show what would be done
         force (bool): If True, recompile even if file exists
+        lock_dir (Path): Directory holding the build lock files
+        changed (bool): If True, git reported the icon's inputs as changed
+        profile (dict): actool output profile (None uses the default profile)
+        events (ProgressBus): Progress event bus (None prints human-readable output)
+        verbose (bool): Keep actool logs on success and compress older output
+        log_tail (int): Bytes of actool output kept in memory and in the log
+        lock_timeout (float): Seconds to wait for the target lock (None waits forever)
 
     Returns:
         bool: True if processing succeeded, False if failed
     """
     name = icon_file.stem.replace('.icon', '')
     car_file = macos26_dir / f"{name}.car"
+    log_file = macos26_dir / f"{name}.log"
+    events = events or ProgressBus(STAGE)
 
-    print(f"[{step:>{len(str(total))}}/{total}] Processing {name}")
+    events.start(name, step, total)
 
     # Dry run - just show what would happen
     if dry_run:
-        action = "Would recompile" if car_file.exists() else "Would compile"
-        print(f"  -> {action}: {car_file}")
-        print()
+        reason = rebuild_reason(icon_file, car_file, force, changed, profile)
+        if reason is None:
+            events.skip(name, f"Up to date: {car_file}", car_file)
+        else:
+            action = "Would recompile" if car_file.exists() else "Would compile"
+            events.finish(name, f"{action} ({reason}): {car_file}", "would-compile", car_file)
         return True
 
-    # Skip if up to date (unless forced)
-    if car_file.exists() and not force:
-        if icon_file.stat().st_mtime <= car_file.stat().st_mtime:
-            print(f"  -> Up to date: {car_file}")
-            print()
-            return True
+    lock = BuildLock(f"car-{name}", lock_dir, lock_timeout)
+    before = target_signature(car_file)
 
     try:
-        # Create temporary output directory
-        output_dir = macos26_dir / f"{name}_output"
-        output_dir.mkdir(exist_ok=True)
-
-        # Use actool to compile .icon to Assets.car
-        subprocess.run([
-            actool, str(icon_file),
-            "--compile", str(output_dir),
-            "--platform", "macosx",
-            "--minimum-deployment-target", "11.0",
-            "--app-icon", name,
-            "--output-partial-info-plist", str(output_dir / "partial-info.plist"),
-            "--enable-icon-stack-fallback-generation=disabled"
-        ], check=True, capture_output=True)
-
-        # Move Assets.car to final location
-        assets_car = output_dir / "Assets.car"
-        if assets_car.exists():
-            shutil.copy2(assets_car, car_file)
-
-            # Check for backwards-compatible .icns
-            icns_file = output_dir / f"{name}.icns"
-            if icns_file.exists():
-                print(f"  -> Also generated {name}.icns")
+        lock.acquire()
+    except LockTimeout as e:
+        events.error(name, str(e))
+        return False
 
-            # Clean up temporary directory
-            shutil.rmtree(output_dir)
+    with lock:
+        # Another process compiled this target (with our profile) while we were waiting
+        if lock.waited and target_signature(car_file) not in (None, before) and profile_reason(car_file, profile) is None:
+            events.finish(name, f"Reused (compiled by another process): {car_file}", "reused", car_file)
+            return True
 
-            action = "Recompiled" if force and car_file.exists() else "Compiled"
-            print(f"  -> {action}: {car_file}")
-            print()
+        # Skip if up to date (unless forced)
+        if rebuild_reason(icon_file, car_file, force, changed, profile) is None:
+            events.skip(name, f"Up to date: {car_file}", car_file)
             return True
-        else:
-            print(f"  -> ERROR: No Assets.car generated")
-            print()
+
+        existed = car_file.exists()
+        output_dir = macos26_dir / f"{name}_output"
+
+        try:
+            # Create temporary output directory
+            output_dir.mkdir(exist_ok=True)
+
+            # Use actool to compile .icon to Assets.car
+            run_captured(actool_args(actool, icon_file, output_dir, name, profile), log_file, log_tail, verbose)
+
+            # Move Assets.car to final location
+            assets_car = output_dir / "Assets.car"
+            if assets_car.exists():
+                # Copy then rename so readers never see a half-written file
+                tmp_car = macos26_dir / f".{name}.car.tmp"
+                shutil.copy2(assets_car, tmp_car)
+                os.replace(tmp_car, car_file)
+                write_profile(profile_record(car_file), profile)
+
+                # Check for backwards-compatible .icns
+                icns_file = output_dir / f"{name}.icns"
+                kept_icns = macos26_dir / f"{name}.icns"
+                keep_icns = bool(profile and profile.get("keep_icns"))
+                if icns_file.exists():
+                    if keep_icns:
+                        shutil.copy2(icns_file, kept_icns)
+                        events.info(name, f"Also generated {name}.icns (kept)")
+                    else:
+                        events.info(name, f"Also generated {name}.icns")
+
+                # A kept .icns must come from this compile; drop one left by another profile
+                if not (keep_icns and icns_file.exists()) and kept_icns.exists():
+                    kept_icns.unlink()
+                    events.info(name, f"Removed stale {kept_icns}")
+
+                action = "Recompiled" if existed else "Compiled"
+                events.finish(name, f"{action}: {car_file}", action.lower(), car_file)
+                return True
+            else:
+                events.error(name, "No Assets.car generated")
+                return False
+
+        except ToolError as e:
+            events.error(name, "actool compilation failed", e.result.summary())
             return False
+        except Exception as e:
+            events.error(name, str(e))
+            return False
+        finally:
+            # Clean up temporary directory
+            shutil.rmtree(output_dir, ignore_errors=True)
 
-    except subprocess.CalledProcessError:
-        print(f"  -> ERROR: actool compilation failed")
-        print()
-        return False
-    except Exception as e:
-        print(f"  -> ERROR: {str(e)}")
-        print()
-        return False
+def report_sizes(macos26_dir, icons_dir, skip_icons, config, json_file=None):
+    """
+    Print the size budget report for every compiled, non-skipped Assets.car.
+
+    The report always covers the whole output directory, not just the icons
+    compiled by this run, so medians and outliers are meaningful with --since.
+
+    Args:
+        macos26_dir (Path): Output directory for Assets.car files
+        icons_dir (Path): Directory containing .icon files
+        skip_icons (set): Icon names skipped by configuration
+        config (dict): Parsed configuration (for the size budget)
+        json_file (str): Also write the report as JSON here ("-" or None: don't)
+
+    Returns:
+        list: Names of icons over their size budget
+    """
+    entries = [(car_file.stem, car_file, source_png(icons_dir / f"{car_file.stem}.icon"))
+               for car_file in sorted(macos26_dir.glob("*.car")) if car_file.stem not in skip_icons]
+    report = build_size_report(entries, load_budget(config))
+    print_size_report(report)
+    if json_file and json_file != "-":
+        write_size_report_json(report, json_file)
+    return [row["name"] for row in report["icons"] if any(flag.startswith("over budget") for flag in row["flags"])]
+
+def clean_stale_outputs(macos26_dir, lock_dir=DEFAULT_LOCK_DIR):
+    """
+    Remove temporary *_output directories left behind by crashed runs.
+
+    Must be called with the global lock held. Directories whose target lock
+    is currently held by a live process are left alone.
+
+    Args:
+        macos26_dir (Path): Output directory for Assets.car files
+        lock_dir (Path): Directory holding the build lock files
+
+    Returns:
+        int: Number of directories removed
+    """
+    removed = 0
+    for output_dir in macos26_dir.glob("*_output"):
+        name = output_dir.name[:-len("_output")]
+        if not output_dir.is_dir() or BuildLock(f"car-{name}", lock_dir).is_locked():
+            continue
+        shutil.rmtree(output_dir, ignore_errors=True)
+        removed += 1
+    return removed
 
 def main():
     """
@@ -152,15 +478,21 @@ def main():
 
     Orchestrates the complete Assets.car compilation process:
     1. Validates command line arguments and shows help if requested
-    2. Checks for required dependencies (Xcode/actool)
-    3. Sets up directory structure
-    4. Discovers .icon source files
-    5. Processes each .icon through the compilation pipeline
-    6. Reports final results
+    2. Asks git which icons changed when --since is given
+    3. Checks for required dependencies (Xcode/actool)
+    4. Sets up directory structure
+    5. Discovers .icon source files
+    6. Processes each .icon through the compilation pipeline
+    7. Reports final results and records the build stamp
+
+    With --plan, steps 3-7 are replaced by printing a JSON rebuild plan.
+    With --size-report, a size budget report of all Assets.car files is printed at the end.
 
     Exit codes:
-        0: Success - all icons compiled
+        0: Success - all icons compiled (or, with --plan, work to do)
         1: Error - missing dependencies, directories, or compilation failure
+           (or, with --enforce-budget, an Assets.car over its size budget)
+        3: Nothing to do (--plan only)
     """
     parser = argparse.ArgumentParser(
         description="Compile .icon files to Assets.car for macOS Tahoe icon support",
@@ -170,28 +502,109 @@ Examples:
   python3 Library/generate_tahoe_assets_car.py --dry-run          # Preview what would be done
   python3 Library/generate_tahoe_assets_car.py --force            # Force recompile all files
   python3 Library/generate_tahoe_assets_car.py --icons-dir custom # Use custom directory
+  python3 Library/generate_tahoe_assets_car.py --since origin/master # Only icons changed since a revision
+  python3 Library/generate_tahoe_assets_car.py --since auto       # Only icons changed since the last build
+  python3 Library/generate_tahoe_assets_car.py --plan --since auto # JSON plan, exit 3 if nothing to do
+  python3 Library/generate_tahoe_assets_car.py --profile compact --force # Recompile for smallest output
+  python3 Library/generate_tahoe_assets_car.py --dry-run --size-report # Size budget report of existing files
+  python3 Library/generate_tahoe_assets_car.py --verbose --log-tail 256 # Keep full actool logs
 
 Notes:
   - Requires Xcode (provides actool compiler)
   - Processes .icon files from icon-files directory
   - Outputs to icons/macos-26+/ as Assets.car files
+  - Concurrent runs wait for each other per icon and reuse finished results
+  - Output profiles: default (macOS 11+), compact (macOS 26+, smallest),
+    compatible (fallback renditions and .icns kept); files compiled with another
+    profile are recompiled automatically
+  - Failed compiles leave the tail of actool's output in icons/macos-26+/<name>.log
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument("--dry-run", action="store_true", help="Show what would be processed without compiling files")
     parser.add_argument("--force", action="store_true", help="Force recompilation of all Assets.car files, even if up to date")
     parser.add_argument("--icons-dir", default="icons/icon-files", help="Directory containing .icon files (default: icons/icon-files)")
+    parser.add_argument("--actool", default=ACTOOL, help=f"Path to the actool compiler (default: {ACTOOL})")
+    parser.add_argument("--lock-dir", default=str(DEFAULT_LOCK_DIR), help=f"Directory for cross-process lock files (default: {DEFAULT_LOCK_DIR})")
+    parser.add_argument("--lock-timeout", type=float, metavar="SECONDS", help="Give up on an icon if its lock is held longer than this by another process (default: wait forever)")
+    parser.add_argument("--since", metavar="REV", help="Only recompile icons whose inputs changed since git revision REV ('auto' uses the last successful build revision)")
+    parser.add_argument("--stamp-file", default=str(DEFAULT_STAMP_FILE), help=f"File recording the last successful build revision (default: {DEFAULT_STAMP_FILE})")
+    parser.add_argument("--plan", action="store_true", help="Print a JSON plan of what would be recompiled and why, without running actool (exit 3 if nothing to do)")
+    parser.add_argument("--profile", help="actool output profile: default, compact, compatible or one from tahoe_config.json (default: car_profile from config, else default)")
+    parser.add_argument("--size-report", nargs="?", const="-", metavar="FILE", help="Print a per-icon size budget report at the end (and write it as JSON to FILE if given)")
+    parser.add_argument("--enforce-budget", action="store_true", help="Exit with an error if any Assets.car is over its size budget (implies --size-report)")
+    parser.add_argument("--verbose", action="store_true", help="Keep actool logs for every icon, compressing output beyond the log tail into <name>.log.1.gz")
+    parser.add_argument("--log-tail", type=int, default=DEFAULT_TAIL_BYTES // 1024, metavar="KB", help=f"Kilobytes of actool output kept per icon for its log (default: {DEFAULT_TAIL_BYTES // 1024})")
+    add_progress_arguments(parser)
     args = parser.parse_args()
+    if args.log_tail <= 0:
+        parser.error("--log-tail must be a positive number of kilobytes")
+
+    # In plan mode stdout carries only the JSON plan; everything else goes to stderr.
+    # Planning never touches tools or writes outputs, just like a dry run.
+    plan_out = sys.stdout
+    if args.plan:
+        sys.stdout = sys.stderr
+        args.dry_run = True
 
     print("==> Tahoe Assets Generator for Emacs Icons")
-    if args.dry_run:
+    if args.plan:
+        print("    [PLAN MODE]")
+    elif args.dry_run:
         print("    [DRY RUN MODE]")
     if args.force:
         print("    [FORCE MODE]")
+
+    # Resolve the actool output profile
+    config = read_config()
+    profile_name, profile = load_profile(args.profile, config)
+    if profile is None:
+        print(f"ERROR: Unknown output profile '{profile_name}'")
+        sys.exit(1)
+    if profile_name != "default":
+        print(f"    [PROFILE: {profile_name}]")
     print()
 
+    # Per-icon progress is reported as events (human-readable output by default)
+    events = open_progress(STAGE, args.progress, args.events)
+
+    # Check icons directory exists
+    icons_dir = Path(args.icons_dir)
+    if not icons_dir.exists():
+        print(f"ERROR: {args.icons_dir}/ directory not found")
+        print("Run generate_icon_files.py first")
+        sys.exit(1)
+
+    # Ask git which icons changed (None means check every icon by timestamp)
+    stamp_file = Path(args.stamp_file)
+    lock_dir = Path(args.lock_dir)
+    changed = None
+    if args.since and args.force:
+        print(f"Ignoring --since {args.since}: --force rebuilds every icon")
+        print()
+    elif args.since:
+        changed = changed_icon_names(args.since, STAGE, ORIGINALS_DIR, icons_dir, ("originals", "icon_files", "config"), stamp_file)
+        if changed is not None:
+            # A different output profile (e.g. from --profile) is a change git cannot see
+            changed |= profile_changed_icons(icons_dir, MACOS26_DIR, profile)
+        if changed is not None and not changed:
+            print(f"No relevant changes since {args.since}, nothing to do")
+            if args.plan:
+                sys.exit(BuildPlan(STAGE, resolve_since(args.since, STAGE, stamp_file)).emit(plan_out))
+            if args.size_report or args.enforce_budget:
+                print()
+                over_budget = report_sizes(MACOS26_DIR, icons_dir, load_config(), config, args.size_report)
+                if args.enforce_budget and over_budget:
+                    print(f"ERROR: Over size budget: {', '.join(over_budget)}")
+                    sys.exit(1)
+            if not args.dry_run:
+                write_stamp(STAGE, stamp_file, lock_dir, args.lock_timeout)
+                write_profile(MACOS26_DIR / RUN_PROFILE_RECORD, profile)
+            return
+        print()
+
     # Check for actool (skip in dry-run to avoid unnecessary checks)
-    actool = "/Applications/Xcode.app/Contents/Developer/usr/bin/actool"
+    actool = args.actool
     if not args.dry_run:
         if not os.path.exists(actool):
             print("ERROR: actool not found. Please install Xcode")
@@ -203,17 +616,16 @@ Notes:
             print("ERROR: actool not working. Try: xcodebuild -runFirstLaunch")
             sys.exit(1)
 
-    # Check icons directory exists
-    icons_dir = Path(args.icons_dir)
-    if not icons_dir.exists():
-        print(f"ERROR: {args.icons_dir}/ directory not found")
-        print("Run generate_icon_files.py first")
-        sys.exit(1)
-
-    # Create tahoe directory
-    macos26_dir = Path("icons/macos-26+")
+    # Create tahoe directory and clean up after crashed runs
+    macos26_dir = MACOS26_DIR
     if not args.dry_run:
-        macos26_dir.mkdir(exist_ok=True)
+        try:
+            with global_lock(lock_dir, args.lock_timeout):
+                macos26_dir.mkdir(exist_ok=True)
+                clean_stale_outputs(macos26_dir, lock_dir)
+        except LockTimeout as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
 
     # Load configuration for skipped icons
     skip_icons = load_config()
@@ -221,9 +633,13 @@ Notes:
         print(f"Skipping icons from config: {', '.join(sorted(skip_icons))}")
         print()
 
-    # Find all .icon files to process
-    icon_files = list(icons_dir.glob("*.icon"))
-    if not icon_files:
+    # Find all .icon files to process (only the changed ones with --since)
+    scan_started = time.monotonic()
+    if changed is not None:
+        icon_files = select_sources(changed, icons_dir, ".icon")
+    else:
+        icon_files = list(icons_dir.glob("*.icon"))
+    if not icon_files and changed is None:
         print(f"No .icon files found in {args.icons_dir}/ directory")
         print("Run generate_icon_files.py first")
         sys.exit(1)
@@ -240,27 +656,44 @@ Notes:
     
     icon_files = filtered_icon_files
 
+    # Icons reported by git are rebuilt regardless of timestamps
+    in_git_changes = changed is not None
+
     # Show what will be processed
     total_found = len(icon_files) + skipped_count
-    print(f"Found {total_found} .icon files ({len(icon_files)} to process, {skipped_count} skipped):")
+    items = []
     for icon_file in sorted(icon_files):
         output_path = macos26_dir / f"{icon_file.stem.replace('.icon', '')}.car"
         status = "missing"
         if output_path.exists():
-            status = "will update" if args.force or icon_file.stat().st_mtime > output_path.stat().st_mtime else "up to date"
-        print(f"  - {icon_file.stem.replace('.icon', '')} ({status})")
-    print()
+            status = "will update" if rebuild_reason(icon_file, output_path, args.force, in_git_changes, profile) else "up to date"
+        items.append({"name": icon_file.stem.replace('.icon', ''), "status": status})
+    events.scan(f"Found {total_found} .icon files ({len(icon_files)} to process, {skipped_count} skipped):", items,
+                found=total_found, to_process=len(icon_files), skipped=skipped_count,
+                duration=round(time.monotonic() - scan_started, 3))
+
+    # Plan mode - report what would be recompiled and stop
+    if args.plan:
+        plan = BuildPlan(STAGE, resolve_since(args.since, STAGE, stamp_file) if in_git_changes else None)
+        plan.skipped = skipped_count
+        for icon_file in sorted(icon_files):
+            name = icon_file.stem.replace('.icon', '')
+            car_file = macos26_dir / f"{name}.car"
+            plan.add(name, icon_file, car_file, rebuild_reason(icon_file, car_file, args.force, in_git_changes, profile))
+        events.close()
+        sys.exit(plan.emit(plan_out))
 
     # Process each .icon file
     processed = skipped = 0
     failed = []
 
     for i, icon_file in enumerate(sorted(icon_files), 1):
-        result = compile_icon_to_car(icon_file, icons_dir, macos26_dir, actool, i, len(icon_files), args.dry_run, args.force)
+        result = compile_icon_to_car(icon_file, icons_dir, macos26_dir, actool, i, len(icon_files), args.dry_run, args.force, lock_dir, in_git_changes, profile, events, args.verbose, args.log_tail * 1024, args.lock_timeout)
         if result:
             processed += 1
         else:
             failed.append(icon_file.stem.replace('.icon', ''))
+    events.close()
 
     # Show results summary
     print("==> Summary")
@@ -271,9 +704,23 @@ Notes:
         if failed:
             print(f"Failed: {', '.join(failed)}")
 
+    # Report .car sizes against their source PNGs and the budget
+    over_budget = []
+    if args.size_report or args.enforce_budget:
+        print()
+        over_budget = report_sizes(macos26_dir, icons_dir, skip_icons, config, args.size_report)
+
     # Exit with error if any failed
     if failed:
         sys.exit(1)
+    if args.enforce_budget and over_budget:
+        print(f"ERROR: Over size budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+    # Record this revision for --since auto, and the profile every .car now has
+    if not args.dry_run:
+        write_stamp(STAGE, stamp_file, lock_dir, args.lock_timeout)
+        write_profile(macos26_dir / RUN_PROFILE_RECORD, profile)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+"""
+Git Changes - Git-aware change detection for the icon generators
+
+The generators normally decide what to rebuild by comparing file timestamps.
+A fresh CI checkout gives every file a new mtime, so that check is useless
+there. This module asks git instead which pipeline inputs changed since a
+given revision, so each stage only touches the affected icons.
+
+Change detection uses `git diff --name-only <rev>` (committed and uncommitted
+changes to tracked files) plus `git ls-files --others --exclude-standard`
+(new files not added to git yet), both restricted to the pipeline inputs:
+- icons/originals/       (source PNG files)
+- icons/icon-files/      (.icon directory structures)
+- Library/tahoe_config.json
+
+The revision can be given explicitly (--since REV) or read from a stamp file
+(--since auto) that every successful run updates with the current HEAD:
+- Stamp: icons/.build-stamp.json  ({"<stage>": "<commit sha>", ...})
+
+The stamp file is committed together with the generated outputs it describes,
+so a fresh checkout (e.g. on CI) knows which revision those outputs were built
+from. Inputs changed after that revision, including uncommitted changes and
+untracked new inputs, are reported as changed; the worst case is a redundant
+rebuild, never a missed one. Files ignored by .gitignore are not inputs.
+
+A change to tahoe_config.json can change which icons are skipped and how they
+are built, so it marks every icon of the stages depending on it as changed.
+
+Usage:
+    names = changed_icon_names(args.since, "tahoe-assets", originals_dir, icon_files_dir,
+                               ("originals", "icon_files", "config"), stamp_file)
+    if names is None:
+        ...  # no usable revision, check every icon by timestamp
+"""
+
+import os
+import json
+import subprocess
+from pathlib import Path
+
+from build_lock import DEFAULT_LOCK_DIR, LockTimeout, global_lock
+
+DEFAULT_STAMP_FILE = Path("icons/.build-stamp.json")
+CONFIG_FILE = Path(__file__).parent / "tahoe_config.json"
+AUTO = "auto"
+
+class GitError(Exception):
+    """Raised when git is unavailable or the revision cannot be resolved."""
+
+class ChangeSet:
+    """
+    Icons whose inputs changed since a git revision.
+
+    Attributes:
+        rev (str): Revision the working tree was compared against
+        originals (set): Names of changed source PNGs in the originals directory
+        icon_files (set): Names of changed .icon directories
+        config (bool): True if tahoe_config.json changed
+    """
+
+    def __init__(self, rev, originals=None, icon_files=None, config=False):
+        self.rev = rev
+        self.originals = set(originals or ())
+        self.icon_files = set(icon_files or ())
+        self.config = config
+
+def _git(*args):
+    """Run a git command in the current directory and return its stdout."""
+    try:
+        result = subprocess.run(["git", *args], check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise GitError("git not found")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+def _relpath(path):
+    """Return path relative to the current directory as a git pathspec."""
+    return Path(os.path.relpath(Path(path).resolve(), Path.cwd().resolve())).as_posix()
+
+def read_stamp(stage, stamp_file=DEFAULT_STAMP_FILE):
+    """
+    Read the last successful build revision of a stage.
+
+    Args:
+        stage (str): Pipeline stage name
+        stamp_file (Path): Stamp file location
+
+    Returns:
+        str: Commit SHA, or None if the stage has no stamp yet
+    """
+    try:
+        with open(stamp_file, "r") as f:
+            return json.load(f).get(stage)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, AttributeError):
+        print(f"WARNING: Invalid stamp file {stamp_file}, ignoring")
+        return None
+
+def write_stamp(stage, stamp_file=DEFAULT_STAMP_FILE, lock_dir=DEFAULT_LOCK_DIR, lock_timeout=None):
+    """
+    Record HEAD as the last successful build revision of a stage.
+
+    The stamp file is shared by all stages, so it is updated under the global
+    lock. Outside a git checkout this is a no-op.
+
+    Args:
+        stage (str): Pipeline stage name
+        stamp_file (Path): Stamp file location
+        lock_dir (Path): Directory holding the build lock files
+        lock_timeout (float): Seconds to wait for the global lock (None waits forever)
+
+    Returns:
+        str: Recorded commit SHA, or None if git or the global lock is unavailable
+    """
+    try:
+        head = _git("rev-parse", "HEAD").strip()
+    except GitError:
+        return None
+
+    stamp_file = Path(stamp_file)
+    try:
+        with global_lock(lock_dir, lock_timeout):
+            try:
+                with open(stamp_file, "r") as f:
+                    stamps = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                stamps = {}
+            stamps[stage] = head
+            stamp_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = stamp_file.with_name(f".{stamp_file.name}.tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(stamps, f, indent=2, sort_keys=True)
+                f.write("\n")
+            os.replace(tmp_file, stamp_file)
+    except LockTimeout as e:
+        print(f"WARNING: Build stamp not updated: {e}")
+        return None
+    return head
+
+def resolve_since(since, stage, stamp_file=DEFAULT_STAMP_FILE):
+    """
+    Turn the --since argument into a git revision.
+
+    Args:
+        since (str): Revision, "auto" to read the stamp file, or None
+        stage (str): Pipeline stage name (used in auto mode)
+        stamp_file (Path): Stamp file location
+
+    Returns:
+        str: Revision to compare against, or None for a full timestamp-based run
+    """
+    if since == AUTO:
+        return read_stamp(stage, stamp_file)
+    return since
+
+def detect_changes(rev, originals_dir, icon_files_dir, config_file=CONFIG_FILE):
+    """
+    Ask git which pipeline inputs changed since a revision.
+
+    Args:
+        rev (str): Git revision to compare the working tree against
+        originals_dir (Path): Directory containing source PNG files
+        icon_files_dir (Path): Directory containing .icon files
+        config_file (Path): Pipeline configuration file
+
+    Returns:
+        ChangeSet: Changed icon names per input directory
+
+    Raises:
+        GitError: If git fails or the revision is unknown
+    """
+    originals = _relpath(originals_dir)
+    icon_files = _relpath(icon_files_dir)
+    config = _relpath(config_file)
+
+    output = _git("diff", "--name-only", "--no-renames", "--relative", rev, "--", originals, icon_files, config)
+    # New inputs that were never added to git are changes too
+    output += _git("ls-files", "--others", "--exclude-standard", "--", originals, icon_files, config)
+
+    changes = ChangeSet(rev)
+    for line in output.splitlines():
+        path = Path(line)
+        if path.as_posix() == config:
+            changes.config = True
+        elif path.parent.as_posix() == originals and path.suffix == ".png":
+            changes.originals.add(path.stem)
+        elif path.as_posix().startswith(icon_files + "/"):
+            top = Path(path.as_posix()[len(icon_files) + 1:]).parts[0]
+            if top.endswith(".icon"):
+                changes.icon_files.add(top[:-len(".icon")])
+    return changes
+
+def select_sources(names, source_dir, suffix):
+    """
+    Map changed icon names to existing source paths without scanning the directory.
+
+    Deleted sources are dropped since there is nothing left to build.
+
+    Args:
+        names (set): Changed icon names
+        source_dir (Path): Directory containing the stage's inputs
+        suffix (str): Source file suffix (".png" or ".icon")
+
+    Returns:
+        list: Existing source paths for the given names
+    """
+    return [source_dir / f"{name}{suffix}" for name in sorted(names) if (source_dir / f"{name}{suffix}").exists()]
+
+def changed_icon_names(since, stage, originals_dir, icon_files_dir, inputs, stamp_file=DEFAULT_STAMP_FILE):
+    """
+    Resolve --since and return the icons a stage has to rebuild.
+
+    Args:
+        since (str): Revision or "auto" from the command line
+        stage (str): Pipeline stage name
+        originals_dir (Path): Directory containing source PNG files
+        icon_files_dir (Path): Directory containing .icon files
+        inputs (tuple): Inputs the stage depends on ("originals", "icon_files", "config")
+        stamp_file (Path): Stamp file location
+
+    Returns:
+        set: Icon names to rebuild, or None if there is no usable revision and
+            every icon must be checked by timestamp
+    """
+    rev = resolve_since(since, stage, stamp_file)
+    if rev is None:
+        print(f"No build stamp for {stage} in {stamp_file}, checking all icons")
+        return None
+
+    try:
+        changes = detect_changes(rev, originals_dir, icon_files_dir)
+    except GitError as e:
+        print(f"WARNING: git change detection failed ({e}), checking all icons")
+        return None
+
+    names = set()
+    if changes.config and "config" in inputs:
+        print(f"{CONFIG_FILE.name} changed since {rev}, rebuilding all icons")
+        if "originals" in inputs:
+            names |= {path.stem for path in Path(originals_dir).glob("*.png")}
+        if "icon_files" in inputs:
+            names |= {path.stem for path in Path(icon_files_dir).glob("*.icon")}
+
+    if "originals" in inputs:
+        names |= changes.originals
+    if "icon_files" in inputs:
+        names |= changes.icon_files
+    return names
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+"""
+Progress Events - Typed progress events for the icon generators
+
+Every generator reports per-icon progress as typed events instead of raw
+print() calls. Events are fanned out to one or more sinks:
+- human:  the classic multi-line output ("[i/N] Processing", "  -> ...")
+- tty:    a single, rate-limited progress line for interactive terminals
+- log:    one plain, timestamped line per result, suited to CI logs
+- quiet:  no progress output
+- NDJSON: one JSON object per line, written to a file or file descriptor
+          (--events PATH or --events fd:N), for following a run programmatically
+
+Event types:
+- scan:   sources discovered (counts and per-icon status)
+- start:  work on an icon begins
+- info:   intermediate message about an icon
+- skip:   icon needs no work (up to date)
+- finish: icon processed (includes dry-run and reused results)
+- error:  icon failed
+
+Every event carries "event", "stage", "ts" (epoch seconds) and "elapsed"
+(seconds since the run started); skip/finish/error also carry "duration"
+(seconds since the icon's start event).
+
+NDJSON output is block-buffered and flushed once per second by a background
+thread (and on close), so large runs are not slowed down by per-line flushes
+while `tail -f` still sees a long-running icon's start event within a second.
+
+Usage:
+    events = open_progress("tahoe-assets", args.progress, args.events)
+    events.start(name, step, total)
+    events.finish(name, f"Compiled: {car_file}", action="compiled", output=car_file)
+    events.close()
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+
+PROGRESS_MODES = ("human", "tty", "log", "quiet")
+NDJSON_BUFFER_SIZE = 64 * 1024
+
+class HumanSink:
+    """Renders events as the classic multi-line generator output."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, event):
+        kind = event["event"]
+        out = self.stream
+        if kind == "scan":
+            out.write(f"{event['message']}\n")
+            for item in event["items"]:
+                out.write(f"  - {item['name']} ({item['status']})\n")
+            out.write("\n")
+        elif kind == "start":
+            width = len(str(event["total"]))
+            out.write(f"[{event['step']:>{width}}/{event['total']}] Processing {event['name']}\n")
+        elif kind == "info":
+            out.write(f"  -> {event['message']}\n")
+        elif kind in ("skip", "finish", "error"):
+            prefix = "ERROR: " if kind == "error" else ""
+            out.write(f"  -> {prefix}{event['message']}\n")
+            if event.get("detail"):
+                out.write(f"     {event['detail']}\n")
+            out.write("\n")
+
+    def close(self):
+        self.stream.flush()
+
+class TtySink:
+    """Renders a single progress line, redrawn at most every `interval` seconds."""
+
+    def __init__(self, stream=None, interval=0.1):
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self.last_draw = 0.0
+        self.counts = {"finish": 0, "skip": 0, "error": 0}
+        self.step = self.total = 0
+        self.name = ""
+        self.width = 0
+
+    def _draw(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_draw < self.interval:
+            return
+        self.last_draw = now
+        line = (f"[{self.step}/{self.total}] {self.name}  "
+                f"(done {self.counts['finish']}, up to date {self.counts['skip']}, failed {self.counts['error']})")
+        self.stream.write("\r" + line.ljust(self.width))
+        self.width = len(line)
+        self.stream.flush()
+
+    def write(self, event):
+        kind = event["event"]
+        if kind == "scan":
+            self.stream.write(f"{event['message']}\n")
+        elif kind == "start":
+            self.step, self.total, self.name = event["step"], event["total"], event["name"]
+            self._draw()
+        elif kind in self.counts:
+            self.counts[kind] += 1
+            if kind == "error":
+                # Errors stay visible above the progress line
+                self.stream.write("\r" + " " * self.width + "\r")
+                self.stream.write(f"ERROR {event['name']}: {event['message']}\n")
+                self.width = 0
+                self._draw(force=True)
+            else:
+                self._draw(force=self.step == self.total)
+
+    def close(self):
+        if self.total:
+            self._draw(force=True)
+            self.stream.write("\n")
+        self.stream.flush()
+
+class LogSink:
+    """Renders one plain, timestamped line per scan and result event."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, event):
+        kind = event["event"]
+        if kind not in ("scan", "skip", "finish", "error"):
+            return
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(event["ts"]))
+        name = event.get("name", "-")
+        duration = f" {event['duration']:.2f}s" if "duration" in event else ""
+        detail = f" ({event['detail']})" if event.get("detail") else ""
+        self.stream.write(f"{stamp} {event['stage']} {kind:<6} {name}{duration} {event['message'].rstrip(':')}{detail}\n")
+
+    def close(self):
+        self.stream.flush()
+
+class NdjsonSink:
+    """Writes events as newline-delimited JSON with time-based flushing."""
+
+    def __init__(self, target, flush_interval=1.0):
+        """
+        Args:
+            target (str): File path, or "fd:N" for an already open descriptor
+            flush_interval (float): Maximum seconds an event stays buffered
+
+        Raises:
+            ValueError: If an "fd:N" target is not a number
+            OSError: If the file cannot be opened or the descriptor is not open
+        """
+        if target.startswith("fd:"):
+            try:
+                fd = int(target[3:])
+            except ValueError:
+                raise ValueError(f"invalid file descriptor '{target[3:]}'")
+            # fdopen() does not notice a closed descriptor until the first flush
+            os.fstat(fd)
+            self.stream = os.fdopen(fd, "w", buffering=NDJSON_BUFFER_SIZE, closefd=False)
+        else:
+            self.stream = open(target, "a", buffering=NDJSON_BUFFER_SIZE)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_periodically, name="ndjson-flush", daemon=True)
+        self.flusher.start()
+
+    def _flush_periodically(self):
+        """Flush pending events every flush_interval until the sink is closed."""
+        while not self.stopped.wait(self.flush_interval):
+            with self.lock:
+                if self.dirty:
+                    self.stream.flush()
+                    self.dirty = False
+
+    def write(self, event):
+        with self.lock:
+            self.stream.write(json.dumps(event, separators=(",", ":")) + "\n")
+            self.dirty = True
+
+    def close(self):
+        self.stopped.set()
+        self.flusher.join()
+        with self.lock:
+            self.stream.flush()
+            self.stream.close()
+
+class ProgressBus:
+    """
+    Dispatches typed progress events to a set of sinks.
+
+    Safe to use from several threads; events are delivered in emit order.
+    """
+
+    def __init__(self, stage, sinks=None):
+        """
+        Args:
+            stage (str): Pipeline stage name included in every event
+            sinks (list): Sinks to dispatch to (default: a HumanSink on stdout)
+        """
+        self.stage = stage
+        self.sinks = [HumanSink()] if sinks is None else sinks
+        self.started = time.monotonic()
+        self.icon_started = {}
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def emit(self, kind, **fields):
+        """
+        Build an event and hand it to every sink.
+
+        Args:
+            kind (str): Event type (scan, start, info, skip, finish, error)
+            **fields: Event payload; Path values are converted to strings
+
+        Returns:
+            dict: The emitted event
+        """
+        now = time.monotonic()
+        event = {"event": kind, "stage": self.stage, "ts": round(time.time(), 3), "elapsed": round(now - self.started, 3)}
+        for key, value in fields.items():
+            if value is not None:
+                event[key] = value if isinstance(value, (str, int, float, bool, list, dict)) else str(value)
+        with self.lock:
+            name = fields.get("name")
+            if kind == "start":
+                self.icon_started[name] = now
+            elif kind in ("skip", "finish", "error") and name in self.icon_started:
+                event["duration"] = round(now - self.icon_started.pop(name), 3)
+            for sink in self.sinks:
+                sink.write(event)
+        return event
+
+    def scan(self, message, items, **fields):
+        """Report discovered sources; items are {"name", "status"} dicts."""
+        return self.emit("scan", message=message, items=items, **fields)
+
+    def start(self, name, step, total):
+        """Report that work on an icon begins."""
+        return self.emit("start", name=name, step=step, total=total)
+
+    def info(self, name, message):
+        """Report an intermediate message about an icon."""
+        return self.emit("info", name=name, message=message)
+
+    def skip(self, name, message, output=None, reason="up to date"):
+        """Report that an icon needs no work."""
+        return self.emit("skip", name=name, message=message, output=output, reason=reason)
+
+    def finish(self, name, message, action=None, output=None):
+        """Report that an icon was processed."""
+        return self.emit("finish", name=name, message=message, action=action, output=output)
+
+    def error(self, name, message, detail=None):
+        """Report that an icon failed."""
+        return self.emit("error", name=name, message=message, detail=detail)
+
+    def close(self):
+        """Flush and close all sinks (safe to call more than once)."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            for sink in self.sinks:
+                sink.close()
+
+def add_progress_arguments(parser):
+    """
+    Add the shared --progress and --events options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+    """
+    parser.add_argument("--progress", choices=PROGRESS_MODES, default="human", help="Progress display: human (default), tty (single updating line), log (one line per icon) or quiet")
+    parser.add_argument("--events", metavar="TARGET", help="Also write NDJSON progress events to a file path or file descriptor (fd:N)")
+
+def open_progress(stage, mode="human", events=None, stream=None):
+    """
+    Create a progress bus for a generator run.
+
+    The bus is closed automatically at interpreter exit, so buffered NDJSON
+    events are not lost when a script exits early.
+
+    Args:
+        stage (str): Pipeline stage name
+        mode (str): Display mode from PROGRESS_MODES
+        events (str): NDJSON target (file path or "fd:N"), or None
+        stream (file): Display stream (default: current sys.stdout)
+
+    Returns:
+        ProgressBus: Bus with the requested sinks
+
+    Exits with an error if the NDJSON target cannot be opened.
+    """
+    stream = stream or sys.stdout
+    sinks = []
+    if mode == "human":
+        sinks.append(HumanSink(stream))
+    elif mode == "tty":
+        sinks.append(TtySink(stream) if stream.isatty() else LogSink(stream))
+    elif mode == "log":
+        sinks.append(LogSink(stream))
+    if events:
+        try:
+            sinks.append(NdjsonSink(events))
+        except ValueError as e:
+            print(f"ERROR: Invalid --events target {events}: {e}")
+            sys.exit(1)
+        except OSError as e:
+            print(f"ERROR: Cannot write progress events to {events}: {e.strerror}")
+            sys.exit(1)
+    bus = ProgressBus(stage, sinks)
+    atexit.register(bus.close)
+    return bus
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+"""
+Size Report - Per-icon Assets.car size budget report
+
+icons/macos-26+/ is the largest directory in the repository and is fetched on
+every install, so the size of each compiled Assets.car matters. This module
+compares every .car file against its source PNG and a size budget, and flags:
+- over budget: the .car exceeds the absolute size or the size ratio budget
+- outlier:     the .car is far larger than the median .car of all icons
+
+Budget configuration (Library/tahoe_config.json, all keys optional):
+    "size_budget": {
+      "max_bytes": 5242880,      # absolute limit per .car file
+      "max_ratio": 20.0,         # limit on .car size / source PNG size (null = off)
+      "outlier_factor": 2.0      # .car size above median * factor is an outlier
+    }
+
+The ratio budget is off by default, and outliers are judged by .car size rather
+than by ratio: actool emits renditions of fixed sizes, so small source PNGs
+naturally produce large ratios.
+
+Usage:
+    report = build_size_report(entries, budget)
+    print_size_report(report)
+    write_size_report_json(report, "size-report.json")
+"""
+
+import json
+import statistics
+from pathlib import Path
+
+DEFAULT_BUDGET = {
+    "max_bytes": 5 * 1024 * 1024,
+    "max_ratio": None,
+    "outlier_factor": 2.0,
+}
+
+def load_budget(config):
+    """
+    Merge the configured size budget over the defaults.
+
+    Args:
+        config (dict): Parsed tahoe_config.json contents
+
+    Returns:
+        dict: Budget with max_bytes, max_ratio and outlier_factor
+    """
+    budget = dict(DEFAULT_BUDGET)
+    budget.update(config.get("size_budget", {}))
+    return budget
+
+def _size(path):
+    """Return file size in bytes, or None if the file does not exist."""
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return None
+
+def build_size_report(entries, budget=DEFAULT_BUDGET):
+    """
+    Compare each compiled .car file against its source PNG and the budget.
+
+    Args:
+        entries (list): (name, car_file, source_png) tuples
+        budget (dict): Budget as returned by load_budget()
+
+    Returns:
+        dict: Report with one row per icon, totals and the list of flagged icons
+    """
+    rows = []
+    for name, car_file, source_png in entries:
+        car_bytes = _size(car_file)
+        png_bytes = _size(source_png)
+        if car_bytes is None:
+            continue
+        ratio = round(car_bytes / png_bytes, 2) if png_bytes else None
+        rows.append({
+            "name": name,
+            "car_bytes": car_bytes,
+            "png_bytes": png_bytes,
+            "ratio": ratio,
+            "flags": [],
+        })
+
+    ratios = [row["ratio"] for row in rows if row["ratio"] is not None]
+    median_ratio = round(statistics.median(ratios), 2) if ratios else None
+    median_car_bytes = int(statistics.median(row["car_bytes"] for row in rows)) if rows else None
+
+    for row in rows:
+        if row["car_bytes"] > budget["max_bytes"]:
+            row["flags"].append("over budget (size)")
+        if budget["max_ratio"] and row["ratio"] is not None and row["ratio"] > budget["max_ratio"]:
+            row["flags"].append("over budget (ratio)")
+        if median_car_bytes and row["car_bytes"] > median_car_bytes * budget["outlier_factor"]:
+            row["flags"].append("outlier")
+
+    rows.sort(key=lambda row: row["car_bytes"], reverse=True)
+    return {
+        "budget": budget,
+        "median_ratio": median_ratio,
+        "median_car_bytes": median_car_bytes,
+        "total_car_bytes": sum(row["car_bytes"] for row in rows),
+        "total_png_bytes": sum(row["png_bytes"] or 0 for row in rows),
+        "icons": rows,
+        "flagged": [row["name"] for row in rows if row["flags"]],
+    }
+
+def _human(size):
+    """Format a byte count for display."""
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def print_size_report(report):
+    """
+    Print the size report as a table, largest .car files first.
+
+    Args:
+        report (dict): Report as returned by build_size_report()
+    """
+    budget = report["budget"]
+    print("==> Size Report")
+    print(f"Budget: {_human(budget['max_bytes'])} per .car, ratio <= {budget['max_ratio'] or 'off'}, "
+          f"outlier > {budget['outlier_factor']}x median .car ({_human(report['median_car_bytes'])})")
+    if not report["icons"]:
+        print("No .car files to report")
+        print()
+        return
+
+    width = max(len("icon"), *(len(row["name"]) for row in report["icons"]))
+    print(f"  {'icon':<{width}}  {'.car':>9}  {'png':>9}  {'ratio':>7}  flags")
+    for row in report["icons"]:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        print(f"  {row['name']:<{width}}  {_human(row['car_bytes']):>9}  {_human(row['png_bytes']):>9}  {ratio:>7}  {', '.join(row['flags'])}")
+    print(f"Total: {_human(report['total_car_bytes'])} of .car files from {_human(report['total_png_bytes'])} of PNG sources")
+    if report["flagged"]:
+        print(f"Flagged: {', '.join(report['flagged'])}")
+    print()
+
+def write_size_report_json(report, path):
+    """
+    Write the size report as JSON.
+
+    Args:
+        report (dict): Report as returned by build_size_report()
+        path (str): Output file path
+    """
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+"""
+Tool Output - Bounded-memory capture of external tool output
+
+External tools such as actool can be very chatty. Buffering their whole output
+with capture_output=True costs memory proportional to the output for every
+running process, and throwing it away leaves failures undiagnosable.
+
+run_captured() instead streams the tool's combined stdout/stderr through a
+fixed-size ring buffer:
+- Memory per invocation is bounded by the ring size plus one read chunk,
+  no matter how much the tool writes, so parallel runs stay flat.
+- The last `tail_bytes` of output are always available; on failure they are
+  written to a log file (e.g. icons/macos-26+/<name>.log).
+- In verbose mode, output rotated out of the ring is compressed on the fly into
+  <log>.1.gz, and logs are kept on success too. The full output is then:
+      zcat <name>.log.1.gz; cat <name>.log
+
+Usage:
+    try:
+        result = run_captured(cmd, log_file=macos26_dir / f"{name}.log", verbose=args.verbose)
+    except ToolError as e:
+        print(e.result.summary())  # last output line and log file
+"""
+
+import os
+import gzip
+import subprocess
+from pathlib import Path
+
+DEFAULT_TAIL_BYTES = 64 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+class RingBuffer:
+    """
+    Keeps the last `capacity` bytes written to it.
+
+    Bytes pushed out of the ring are handed to an optional `on_evict` callback
+    (used for compress-on-rotate) and otherwise dropped.
+    """
+
+    def __init__(self, capacity, on_evict=None):
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self.buffer = bytearray()
+        self.total = 0
+
+    def write(self, data):
+        """Append data, evicting the oldest bytes beyond capacity."""
+        self.total += len(data)
+        self.buffer += data
+        overflow = len(self.buffer) - self.capacity
+        if overflow > 0:
+            if self.on_evict:
+                self.on_evict(bytes(self.buffer[:overflow]))
+            del self.buffer[:overflow]
+
+    @property
+    def truncated(self):
+        """True if some output no longer fits in the ring."""
+        return self.total > len(self.buffer)
+
+    def getvalue(self):
+        """Return the retained tail as bytes."""
+        return bytes(self.buffer)
+
+class CapturedResult:
+    """
+    Outcome of a captured tool run.
+
+    Attributes:
+        args (list): Command line that was run
+        returncode (int): Process exit status
+        tail (bytes): Last bytes of combined stdout/stderr
+        total_bytes (int): Total number of bytes the tool wrote
+        truncated (bool): True if the output did not fit in the ring
+        log_file (Path): Log file written for this run, or None
+    """
+
+    def __init__(self, args, returncode, ring, log_file=None):
+        self.args = args
+        self.returncode = returncode
+        self.tail = ring.getvalue()
+        self.total_bytes = ring.total
+        self.truncated = ring.truncated
+        self.log_file = log_file
+
+    def tail_text(self):
+        """Return the retained tail decoded as text."""
+        return self.tail.decode("utf-8", errors="replace")
+
+    def last_line(self):
+        """Return the last non-empty output line (useful as an error summary)."""
+        for line in reversed(self.tail_text().splitlines()):
+            if line.strip():
+                return line.strip()
+        return ""
+
+    def summary(self):
+        """Return a one-line failure summary: last output line and log file."""
+        summary = self.last_line() or f"exit status {self.returncode}"
+        return f"{summary} (see {self.log_file})" if self.log_file else summary
+
+class ToolError(subprocess.CalledProcessError):
+    """
+    Raised by run_captured() when the tool fails.
+
+    A CalledProcessError whose `output` is the output tail as text, with the
+    full CapturedResult attached as `result`.
+    """
+
+    def __init__(self, result):
+        super().__init__(result.returncode, result.args, output=result.tail_text())
+        self.result = result
+
+def rotated_log(log_file):
+    """Return the compressed log holding output rotated out of the ring."""
+    log_file = Path(log_file)
+    return log_file.with_name(f"{log_file.name}.1.gz")
+
+def remove_logs(log_file):
+    """Remove a log file and its rotated part, if present."""
+    for path in (Path(log_file), rotated_log(log_file)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+def run_captured(args, log_file=None, tail_bytes=DEFAULT_TAIL_BYTES, verbose=False, check=True):
+    """
+    Run a tool, streaming its combined output through a bounded ring buffer.
+
+    Args:
+        args (list): Command line to run
+        log_file (Path): Where to write the output tail on failure (or always,
+            when verbose); stale logs from earlier runs are removed
+        tail_bytes (int): Ring buffer size, i.e. how much output is kept
+        verbose (bool): Keep logs on success and compress rotated output
+        check (bool): Raise CalledProcessError if the tool fails
+
+    Returns:
+        CapturedResult: Exit status and output tail
+
+    Raises:
+        ToolError: If check is True and the tool failed
+    """
+    if log_file is not None:
+        remove_logs(log_file)
+
+    rotated = None
+    on_evict = None
+    if verbose and log_file is not None:
+        rotated = gzip.open(rotated_log(log_file), "wb")
+        on_evict = rotated.write
+    ring = RingBuffer(tail_bytes, on_evict)
+
+    process = None
+    try:
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        with process.stdout:
+            fd = process.stdout.fileno()
+            while True:
+                chunk = os.read(fd, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                ring.write(chunk)
+        returncode = process.wait()
+    finally:
+        # Interrupted while reading (e.g. Ctrl-C): do not leave the tool running
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+        if rotated is not None:
+            rotated.close()
+            if not ring.truncated:
+                # Nothing was rotated out, the tail log holds everything
+                rotated_log(log_file).unlink()
+
+    written = None
+    if log_file is not None and (returncode != 0 or verbose):
+        with open(log_file, "wb") as f:
+            if ring.truncated and rotated is None:
+                f.write(f"[... {ring.total - len(ring.buffer)} earlier bytes dropped ...]\n".encode())
+            f.write(ring.getvalue())
+        written = Path(log_file)
+
+    result = CapturedResult(args, returncode, ring, written)
+    if check and returncode != 0:
+        raise ToolError(result)
+    return result